@@ -0,0 +1,25 @@
+import streamlit as st
+
+from perf import timed_page
+from repository import get_admin_password
+from utils import hash_password
+
+
+@timed_page
+def admin_login_page():
+    st.subheader("Admin Login")
+    username = st.text_input("Username", key="admin_username")
+    password = st.text_input("Password", type="password", key="admin_password")
+    login_button = st.button("Login as Admin")
+
+    if login_button:
+        admin_password = get_admin_password(username)
+        if admin_password and hash_password(password) == admin_password:
+            st.success("Admin login successful!")
+            st.session_state["admin_logged_in"] = True
+            st.rerun()  # Redirect to refresh the session
+        else:
+            st.error("Invalid admin credentials.")
+
+
+admin_login_page()
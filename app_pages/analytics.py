@@ -0,0 +1,72 @@
+import pandas as pd
+import streamlit as st
+
+from perf import phase, timed_page
+from repository import (COMPLIANCE_SUMMARY_COLUMNS, STACKS_MONITORING_COLUMNS, get_compliance_summary,
+                        list_stacks_monitoring)
+from utils import parameter_options
+
+
+@timed_page
+def analytics_page():
+    """District-wise and category-wise registration and form completion, from the summary table."""
+    st.subheader("Compliance Analytics")
+    rows = get_compliance_summary()
+    if not rows:
+        st.warning("No industries registered yet.")
+        return
+    with phase("pandas"):
+        summary = pd.DataFrame(rows, columns=COMPLIANCE_SUMMARY_COLUMNS)
+        summary = summary.replace({"district": {"": "Not given"}, "industry_category": {"": "Not given"}})
+        totals = summary[COMPLIANCE_SUMMARY_COLUMNS[2:]].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Registered Industries", int(totals["industries"]))
+    col2.metric("Stacks Filled", f"{int(totals['completed_stacks'])} / {int(totals['declared_stacks'])}")
+    col3.metric("CEMS Parameters Filled",
+                f"{int(totals['completed_parameters'])} / {int(totals['declared_parameters'])}")
+
+    column_config = {
+        "district": "District",
+        "industry_category": "Category",
+        "industries": "Industries",
+        "declared_stacks": "Stacks Declared",
+        "completed_stacks": "Stacks Filled",
+        "stack_completion": st.column_config.ProgressColumn("Stacks Filled %", format="percent"),
+        "declared_parameters": "Parameters Declared",
+        "completed_parameters": "Parameters Filled",
+        "parameter_completion": st.column_config.ProgressColumn("Parameters Filled %", format="percent"),
+    }
+    for group, label in (("district", "By District"), ("industry_category", "By Category")):
+        with phase("pandas"):
+            grouped = summary.groupby(group, as_index=False)[COMPLIANCE_SUMMARY_COLUMNS[2:]].sum()
+            for completion, completed, declared in (("stack_completion", "completed_stacks", "declared_stacks"),
+                                                    ("parameter_completion", "completed_parameters",
+                                                     "declared_parameters")):
+                grouped[completion] = (grouped[completed] / grouped[declared].where(grouped[declared] > 0)).fillna(0)
+            grouped = grouped.sort_values("industries", ascending=False)
+        st.markdown(f"#### {label}")
+        st.dataframe(grouped, hide_index=True,
+                     column_config=column_config,
+                     column_order=[group, "industries", "declared_stacks", "completed_stacks", "stack_completion",
+                                   "declared_parameters", "completed_parameters", "parameter_completion"])
+
+    st.markdown("#### Stacks Monitoring a Parameter")
+    col1, col2 = st.columns([3, 1])
+    parameter = col1.selectbox("Parameter", parameter_options + ["others"])
+    pending_only = col2.checkbox("Only pending CEMS details")
+    stacks = list_stacks_monitoring(parameter, pending_only)
+    st.caption(f"{len(stacks)} stacks" + (" (first 1000)" if len(stacks) == 1000 else ""))
+    with phase("pandas"):
+        stacks = pd.DataFrame(stacks, columns=STACKS_MONITORING_COLUMNS)
+    st.dataframe(stacks, hide_index=True,
+                 column_order=["industry_name", "district", "stack_identity", "process_attached", "filled"],
+                 column_config={
+                     "industry_name": "Industry Name",
+                     "district": "District",
+                     "stack_identity": "Stack Identity",
+                     "process_attached": "Process Attached",
+                     "filled": st.column_config.CheckboxColumn("CEMS Details Filled"),
+                 })
+
+
+analytics_page()
@@ -0,0 +1,122 @@
+import pandas as pd
+import streamlit as st
+
+from bulk_import import as_text, validate_cems
+from grids import submit_grid
+from journal import get_journal
+from perf import phase, timed_page
+from repository import list_pending_parameters, list_user_stacks
+
+# Grid columns, labelled like the fields of the old one-parameter form
+CEMS_GRID_COLUMNS = {
+    "make": st.column_config.TextColumn("Make"),
+    "model": st.column_config.TextColumn("Model"),
+    "serial_number": st.column_config.TextColumn("Serial Number"),
+    "emission_limit": st.column_config.NumberColumn("SPCB Approved Emission Limit", min_value=0),
+    "measuring_range_low": st.column_config.NumberColumn("Measuring Range (Low)", min_value=0),
+    "measuring_range_high": st.column_config.NumberColumn("Measuring Range (High)", min_value=0),
+    "certified": st.column_config.SelectboxColumn("Is Certified?", options=["Yes", "No"], required=True),
+    "certification_agency": st.column_config.TextColumn("Certification Agency"),
+    "communication_protocol": st.column_config.SelectboxColumn("Communication Protocol",
+                                                               options=["4-20 mA", "RS-485", "RS-232"]),
+    "measurement_method": st.column_config.SelectboxColumn("Measurement Method", options=["In-situ", "Extractive"]),
+    "technology": st.column_config.TextColumn("Technology"),
+    "connected_bspcb": st.column_config.SelectboxColumn("Connected to BSPCB?", options=["Yes", "No"], required=True),
+    "bspcb_url": st.column_config.TextColumn("BSPCB URL"),
+    "connected_cpcb": st.column_config.SelectboxColumn("Connected to CPCB?", options=["Yes", "No"], required=True),
+    "cpcb_url": st.column_config.TextColumn("CPCB URL"),
+}
+# Rows with none of these filled in are left for later instead of being rejected
+IDENTIFYING_COLUMNS = ["make", "model", "serial_number"]
+
+
+def empty_grid(parameters):
+    """One row per pending parameter, with the old form's defaults."""
+    grid = pd.DataFrame({column: [None] * len(parameters) for column in CEMS_GRID_COLUMNS},
+                        index=pd.Index(parameters, name="parameter"), dtype=object)
+    grid["emission_limit"] = grid["measuring_range_low"] = 0.0
+    grid["measuring_range_high"] = float("nan")
+    grid["certified"] = grid["connected_bspcb"] = grid["connected_cpcb"] = "Yes"
+    return grid
+
+
+@timed_page
+def fill_cems_details(user_id):
+    """Form to fill CEMS details."""
+    st.subheader("Enter CEMS Details")
+
+    # Retrieve stack details from the read cache or database
+    stack_details = list_user_stacks(user_id)
+
+    if not stack_details:
+        st.error("No stack details found. Please fill in stack details first.")
+        return
+
+    # Filter stacks that have details filled (stack_id with non-null details)
+    filled_stacks = [stack for stack in stack_details if stack[1]]  # Stack details should not be empty
+    if not filled_stacks:
+        st.error("No filled stack details found. Please fill in stack details first.")
+        return
+
+    cems_form(user_id, filled_stacks)
+
+
+@st.fragment
+@timed_page
+def cems_form(user_id, filled_stacks):
+    """Stack selection plus a grid with one row per pending parameter. Runs as a fragment, so picking
+    another process reruns only this part and not the stack lookup above."""
+    # Dropdown to select stack based on 'process_attached'
+    stack_options = [stack[1] for stack in filled_stacks]  # Using process_attached instead of stack_name
+    selected_process = st.selectbox("Select Process", stack_options)
+
+    # Get the stack ID and parameters based on selected process
+    selected_stack = next(stack for stack in filled_stacks if stack[1] == selected_process)
+    selected_stack_id = selected_stack[0]
+
+    # Parameters of the selected stack that do not have CEMS details yet
+    available_parameters = list_pending_parameters(user_id, selected_stack_id)
+    # Leave out parameters whose details are still waiting in the journal
+    journal = get_journal()
+    journaled = {cems["parameter"] for cems in journal.pending(user_id, "cems")
+                 if cems["stack_id"] == selected_stack_id}
+    journaled.update(cems["parameter"] for batch in journal.pending(user_id, "cems_batch")
+                     if batch["stack_id"] == selected_stack_id for cems in batch["instruments"])
+    available_parameters = [parameter for parameter in available_parameters if parameter not in journaled]
+
+    if not available_parameters:
+        st.warning(f"All parameters for the stack with process '{selected_process}' have already been filled.")
+        return
+
+    st.caption("Fill in one row per parameter. Rows without a Make, Model or Serial Number are left for later.")
+    with phase("pandas"):
+        grid = empty_grid(available_parameters)
+    with st.form(f"cems_form_{selected_stack_id}"):
+        # Keyed on the pending parameters too, so edits never land on the wrong rows once some are saved
+        edited = st.data_editor(
+            grid,
+            key=f"cems_grid_{selected_stack_id}_{'_'.join(available_parameters)}",
+            num_rows="fixed",
+            column_config={"_index": st.column_config.TextColumn("Parameter"), **CEMS_GRID_COLUMNS},
+        )
+        submit_cems = st.form_submit_button("Submit CEMS Details")
+
+    if not submit_cems:
+        return
+
+    # Validate every entered row together, with the same rules as the bulk import
+    with phase("pandas"):
+        edited = edited.reset_index().map(as_text)
+        entered = edited[edited[IDENTIFYING_COLUMNS].notna().any(axis=1)]
+    if entered.empty:
+        st.error("Please fill in the CEMS details of at least one parameter.")
+        return
+    labels = {column: config["label"] for column, config in CEMS_GRID_COLUMNS.items()}
+    with phase("pandas"):
+        check = validate_cems(entered.copy(), labels)
+        instruments = check.df.to_dict("records")
+    submit_grid(check, entered["parameter"], "cems_batch", user_id,
+                {"stack_id": selected_stack_id, "instruments": instruments}, "CEMS details", entered["parameter"])
+
+
+fill_cems_details(st.session_state["user_id"])
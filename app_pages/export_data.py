@@ -0,0 +1,33 @@
+import html
+
+import streamlit as st
+
+from export import EXPORT_FORMATS, export_to_static
+from perf import timed_page
+
+
+@timed_page
+def export_page():
+    """Downloads every industry with its stacks and CEMS instruments as one flat table."""
+    st.subheader("Export Registry")
+    fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True)
+    extension, mime = EXPORT_FORMATS[fmt]
+    file_name = f"industry_registry.{extension}"
+    st.caption("One row per CEMS instrument; industries and stacks without instruments get a row of their own.")
+    if st.button("Prepare Export"):
+        # Written to disk and served from there, so the export is never held in memory
+        with st.spinner("Writing the export..."):
+            st.session_state["export_url"] = (fmt, export_to_static(fmt, file_name))
+    prepared_fmt, url = st.session_state.get("export_url", (None, None))
+    if prepared_fmt != fmt:
+        return
+    if url is None:
+        st.error("This export is over 200 MB, too large to download from the app. Run "
+                 f"`python export.py {extension} {file_name}` on the server instead.")
+        return
+    st.markdown(f'<a href="{html.escape(url)}" download="{file_name}" type="{mime}">Download {file_name}</a>',
+                unsafe_allow_html=True)
+    st.caption("The link stays valid for at least an hour.")
+
+
+export_page()
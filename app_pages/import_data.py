@@ -0,0 +1,44 @@
+import streamlit as st
+
+from bulk_import import IMPORT_COLUMNS, ImportFileError, import_file, template_csv
+from perf import timed_page
+
+
+@timed_page
+def bulk_import_page():
+    """Imports industries, stacks or CEMS instruments from an uploaded CSV or Excel file."""
+    st.subheader("Bulk Import")
+    kind = st.selectbox("What do you want to import?", list(IMPORT_COLUMNS))
+    st.caption("Stacks are matched to industries by state_ocmms_id, and CEMS instruments to stacks by "
+               "state_ocmms_id and stack_identity. List several parameters comma-separated.")
+    st.download_button("Download Template", template_csv(kind), file_name=f"{kind.lower().replace(' ', '_')}.csv",
+                       mime="text/csv")
+
+    uploaded = st.file_uploader("Upload File", type=["csv", "xlsx"])
+    if uploaded is None or not st.button("Import"):
+        return
+
+    progress = st.progress(0.0, text="Importing...")
+    total = uploaded.size or 1
+
+    def on_progress(rows_read):
+        # The read position in the upload approximates progress; it is coarser for zipped Excel files
+        progress.progress(min(uploaded.tell() / total, 1.0), text=f"Read {rows_read} rows...")
+
+    try:
+        imported, report = import_file(kind, uploaded, uploaded.name, on_progress=on_progress)
+    except ImportFileError as e:
+        progress.empty()
+        st.error(str(e))
+        return
+    progress.progress(1.0, text="Import finished.")
+
+    st.success(f"Imported {imported} rows.")
+    if not report.empty:
+        st.warning(f"{len(report)} rows were rejected.")
+        st.dataframe(report, hide_index=True)
+        st.download_button("Download Error Report", report.to_csv(index=False).encode(),
+                           file_name="import_errors.csv", mime="text/csv")
+
+
+bulk_import_page()
@@ -0,0 +1,23 @@
+import streamlit as st
+
+from industry_report import render_industry_report
+from perf import timed_page
+from repository import fetch_industry_report
+
+
+@timed_page
+def show_industry_dashboard(user_id):
+    """Function to display the industry dashboard with industry details."""
+    # st.subheader("Industry Dashboard")
+    st.markdown("<h1 style='text-align: center; color: black;'>Industry Dashboard</h1>", unsafe_allow_html=True)
+
+    # Fetch the industry with its stacks and CEMS instruments in one round trip
+    industry = fetch_industry_report(user_id=user_id)
+    if industry is None:
+        st.warning("No Industry Details Found.")
+        return
+    st.markdown("### Industry Details")
+    render_industry_report(industry)
+
+
+show_industry_dashboard(st.session_state["user_id"])
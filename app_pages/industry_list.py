@@ -0,0 +1,121 @@
+import pandas as pd
+import streamlit as st
+
+from industry_report import render_industry_report
+from perf import phase, timed_page
+from repository import INDUSTRY_LIST_COLUMNS, fetch_industry_report, list_industries
+from utils import category, dist
+
+
+@timed_page
+def display_all_details():
+    """Display one page of registered industries in a selectable table."""
+    # st.subheader("All User-Filled Industry Details")  # Display the heading once at the top
+    # Search and filters are applied in SQL; only the current page is fetched
+    filter_cols = st.columns([3, 2, 2, 1])
+    search_term = filter_cols[0].text_input("Search Industry", "",
+                                            placeholder="Name, address, district, OCMMS Id, CPCB code or contact")
+    district_filter = filter_cols[1].selectbox("District", options=dist, index=None, placeholder="All Districts")
+    category_filter = filter_cols[2].selectbox("Category", options=category, index=None,
+                                               placeholder="All Categories")
+    page_size = filter_cols[3].selectbox("Rows per page", [100, 500, 1000])
+
+    # Go back to the first page whenever the search or filters change
+    filters = (search_term, district_filter, category_filter, page_size)
+    if st.session_state.get("industry_list_filters") != filters:
+        st.session_state["industry_list_filters"] = filters
+        st.session_state["industry_list_page"] = 1
+        # Last ind_id before each visited page; unsearched pages continue from there (keyset paging)
+        st.session_state["industry_list_after"] = [0]
+    page = st.session_state.get("industry_list_page", 1)
+    after = st.session_state["industry_list_after"][page - 1]
+
+    industries, total = list_industries(search_term, district_filter, category_filter, limit=page_size,
+                                        offset=(page - 1) * page_size, after=after)
+    fuzzy = not total and bool(search_term.strip())
+    if fuzzy:
+        # Nothing contains every word as typed; allow one typo per word
+        industries, total = list_industries(search_term, district_filter, category_filter, limit=page_size,
+                                            offset=(page - 1) * page_size, fuzzy=True)
+    if not total:
+        st.warning("No industry details found.")
+        return
+    if fuzzy:
+        st.info(f"No exact matches for \"{search_term}\"; showing close matches.")
+    total_pages = -(-total // page_size)
+    if not industries and page > 1:
+        # Page is past the end (e.g. rows were deleted); start over
+        st.session_state["industry_list_page"] = 1
+        st.rerun()
+
+    with phase("pandas"):
+        frame = pd.DataFrame(industries, columns=INDUSTRY_LIST_COLUMNS)
+    # One virtualized grid instead of a row of widgets per industry; selecting a row opens its details
+    event = st.dataframe(
+        frame,
+        key="industry_list",
+        hide_index=True,
+        height=min(35 * (len(industries) + 1) + 3, 600),
+        column_order=["industry_name", "industry_category", "state_ocmms_id", "cpcb_ind_code", "district",
+                      "production_capacity", "num_stacks"],
+        column_config={
+            "industry_name": "Industry Name",
+            "industry_category": "Category",
+            "state_ocmms_id": "State OCMMS Id",
+            "cpcb_ind_code": "CPCB Industry Code",
+            "district": "District",
+            "production_capacity": "Production Capacity",
+            "num_stacks": "No. of Stacks",
+        },
+        on_select="rerun",
+        selection_mode="single-row",
+    )
+    if event.selection.rows:
+        row = industries[event.selection.rows[0]]
+        # Store both the ind_id and state_ocmms_id in session state
+        st.session_state["selected_ind_id"] = row["ind_id"]
+        st.session_state["selected_state_ocmms_id"] = row["state_ocmms_id"]
+        st.rerun()
+    st.caption("Select a row to view the industry's details.")
+
+    # Pager
+    pager = st.columns([1, 2, 1])
+    if pager[0].button("Previous", disabled=page <= 1):
+        st.session_state["industry_list_page"] = page - 1
+        st.rerun()
+    first = (page - 1) * page_size + 1
+    pager[1].markdown(f"<p style='text-align: center'>Showing {first}-{first + len(industries) - 1} of {total} "
+                      f"industries (page {page} of {total_pages})</p>", unsafe_allow_html=True)
+    if pager[2].button("Next", disabled=page >= total_pages):
+        st.session_state["industry_list_page"] = page + 1
+        st.session_state["industry_list_after"] = (st.session_state["industry_list_after"][:page]
+                                                   + [industries[-1]["ind_id"]])
+        st.rerun()
+
+
+@timed_page
+def show_industry_details(ind_id):
+    """Show detailed information for the selected industry."""
+
+    st.markdown("<h3 style='text-align: center; color: black;'>Industry Details</h3>", unsafe_allow_html=True)
+
+    # Fetch the industry with its stacks and CEMS instruments in one round trip
+    industry = fetch_industry_report(ind_id=ind_id)
+    if industry is None:
+        st.warning("No Industry Details Found.")
+        return
+    render_industry_report(industry)
+
+
+# Add a "Home" button to return to the industry list
+if st.sidebar.button("Return to Dasboard"):
+    st.session_state["selected_ind_id"] = None  # Clear the selected industry
+    st.rerun()  # Refresh the page to go back to the main list
+
+# Check if an industry has been selected
+if st.session_state.get("selected_ind_id"):
+    # Show industry details if an industry is selected
+    show_industry_details(st.session_state["selected_ind_id"])
+else:
+    # Display the list of all industries
+    display_all_details()
@@ -0,0 +1,38 @@
+import streamlit as st
+
+from journal import show_registration_status
+from perf import timed_page
+from repository import get_user_credentials
+from utils import hash_password
+
+
+@timed_page
+def login_page():
+    st.subheader("Login")
+    show_registration_status()
+
+    # Login form
+    email = st.text_input("Industry Representative Email Id")
+    password = st.text_input("Password", type="password")
+    login_button = st.button("Login")
+
+    if login_button:
+        try:
+            # Verify email and password
+            user = get_user_credentials(email)
+
+            if user and hash_password(password) == user[1]:
+                st.success("Login successful!")
+                st.session_state["logged_in"] = True
+                st.session_state["user_id"] = user[0]
+                st.session_state["current_page"] = "Industry Details"
+                st.rerun()
+                st.write(f"User ID in session state: {st.session_state['user_id']}")  # Debugging
+
+            else:
+                st.error("Invalid email or password.")
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
+
+
+login_page()
@@ -0,0 +1,26 @@
+import streamlit as st
+
+from perf import timed_page
+
+
+def refresh_page():
+    st.markdown("""
+        <meta http-equiv="refresh" content="2">
+        """, unsafe_allow_html=True)
+
+
+@timed_page
+def logout():
+    """Function to log out the user and reset session state."""
+    # Reset session state
+    st.session_state["logged_in"] = False
+    st.session_state["user_id"] = None
+    st.session_state["current_page"] = "Login"  # Ensure it redirects to the login page
+    refresh_page()
+    st.session_state.clear()  # Clear other session variables as well (optional)
+
+    # Display a success message
+    st.success("You have successfully logged out.")
+
+
+logout()
@@ -0,0 +1,53 @@
+import pandas as pd
+import streamlit as st
+
+from perf import PERF_LOG_PATH, PERF_WINDOW, get_recorder, timed_page
+
+PERCENTILES = ["p50", "p95", "p99", "max"]
+
+
+def _milliseconds(summary):
+    return {name: round(summary[name] * 1000, 1) for name in PERCENTILES}
+
+
+@timed_page
+def performance_page():
+    """Rolling latency percentiles of reruns and database calls since the server started."""
+    st.subheader("Performance")
+    recorder = get_recorder()
+    st.caption(f"Percentiles over the last {PERF_WINDOW} samples of each series, in milliseconds."
+               + (f" Every sample is also logged to {PERF_LOG_PATH}." if PERF_LOG_PATH else ""))
+
+    st.markdown("#### Reruns")
+    # One row per page, with the p50/p95/p99 of the whole run and of each phase side by side
+    reruns = {}
+    for (name, phase_name), summary in recorder.summaries("rerun"):
+        if not summary["count"]:
+            continue
+        row = reruns.setdefault(name, {"page": name})
+        if phase_name == "total":
+            row["runs"] = summary["count"]
+        for percentile, value in _milliseconds(summary).items():
+            row[f"{phase_name} {percentile}"] = value
+    if reruns:
+        columns = ["page", "runs"] + [f"{phase_name} {percentile}" for phase_name in ("total", "db", "pandas", "render")
+                                      for percentile in ("p50", "p95", "p99")]
+        st.dataframe(pd.DataFrame(list(reruns.values())).reindex(columns=columns)
+                     .sort_values("total p95", ascending=False), hide_index=True)
+    else:
+        st.info("No reruns timed yet.")
+
+    st.markdown("#### Database Calls")
+    calls = [{"page function": page_name, "call": caller, "count": summary["count"], **_milliseconds(summary)}
+             for (page_name, caller), summary in recorder.summaries("query") if summary["count"]]
+    if calls:
+        st.dataframe(pd.DataFrame(calls).sort_values("p95", ascending=False), hide_index=True)
+    else:
+        st.info("No database calls timed yet.")
+
+    if st.button("Reset"):
+        recorder.reset()
+        st.rerun()
+
+
+performance_page()
@@ -0,0 +1,78 @@
+import streamlit as st
+
+from journal import DONE, FAILED, REGISTRATIONS_KEY, submit_and_wait
+from perf import timed_page
+from utils import category, dist, hash_password, isValid, is_valid_email, state_list
+
+
+@timed_page
+def register_page():
+    st.subheader("Register Industry")
+    # Registration form
+    with st.form("register_form"):
+        industry_category = st.selectbox("Industry Category", options=category,placeholder="Select Category",
+                                         index=None)
+        state_ocmms_id = st.text_input("State OCMMS Id")
+        cpcb_ind_code = st.text_input("CPCB Industry Code")
+        industry_name = st.text_input("Industry Name")
+        address = st.text_input("Address")
+        state = st.selectbox("State", options=state_list, placeholder="Select State", index=None)
+        district = st.selectbox("District", options=dist, placeholder="Select District", index=None)
+        production_capacity = st.text_input("Production Capacity")
+        num_stacks = st.number_input("Number of Stacks", min_value=1)
+        industry_environment_head = st.text_input("Environment Department Head")
+        env_phone = st.number_input("Environment Department Head Phone Number", value=None, step=1)
+        industry_instrument_head = st.text_input("Instrumentation Department Head")
+        inst_phone = st.number_input("Instrumentation Department Head Phone Number", value=None, step=1)
+        concerned_person_cems = st.text_input("Concerned Person for CEMS")
+        cems_phone = st.number_input("Concerned Person for CEMS Phone Number", value=None, step=1)
+
+        # Industry Representative Email Id and Password at the end
+        email = st.text_input("Industry Representative Email Id (used for login)")
+        password = st.text_input("Password", type="password")
+
+        submit = st.form_submit_button("Register Industry")
+
+    # Validate mandatory fields
+    if submit:
+        if not (
+                industry_category and state_ocmms_id and industry_name and address and state
+                and district and production_capacity and num_stacks and industry_environment_head
+                and industry_instrument_head and concerned_person_cems and email and password
+                and env_phone and inst_phone and cems_phone):
+            st.error("All fields are mandatory. Please fill in all fields.")
+            return
+
+        # checked the number is valid  or not
+        if not isValid(env_phone) or not isValid(inst_phone) or not isValid(cems_phone) :
+            st.error("kindly enter valid Head mobile number")
+            return
+
+        # Validate email format
+        if not is_valid_email(email):
+            st.error("Please enter a valid email address.")
+            return
+
+        # Journal the registration first so it is not lost if the database is unreachable
+        submission = submit_and_wait("registration", None, {
+            "email": email, "password_hash": hash_password(password), "industry": {
+                "industry_category": industry_category, "state_ocmms_id": state_ocmms_id,
+                "cpcb_ind_code": cpcb_ind_code or None, "industry_name": industry_name, "address": address,
+                "state": state, "district": district, "production_capacity": production_capacity,
+                "num_stacks": num_stacks, "industry_environment_head": industry_environment_head,
+                "env_phone": env_phone, "industry_instrument_head": industry_instrument_head,
+                "inst_phone": inst_phone, "concerned_person_cems": concerned_person_cems,
+                "cems_phone": cems_phone,
+            },
+        })
+        if submission["status"] == DONE:
+            st.success("Industry registered successfully!")
+        elif submission["status"] == FAILED:
+            st.error(submission["last_error"])
+        else:
+            # Followed up on the login page, since the journal has no user to show it to
+            st.session_state.setdefault(REGISTRATIONS_KEY, []).append(submission["submission_id"])
+            st.info("Your registration has been saved and will be completed as soon as the database is "
+                    "reachable. The login page shows when it is done.")
+
+register_page()
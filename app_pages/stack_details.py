@@ -0,0 +1,147 @@
+import pandas as pd
+import streamlit as st
+
+from bulk_import import as_text, validate_stacks
+from grids import submit_grid
+from journal import get_journal
+from perf import phase, timed_page
+from repository import get_stack_progress
+from utils import LATITUDE_RANGE, LONGITUDE_RANGE, parameter_options
+
+# Grid columns, labelled like the fields of the old one-stack form
+STACK_GRID_COLUMNS = {
+    "stack_identity": st.column_config.TextColumn("Stack Identity or identification Number"),
+    "process_attached": st.column_config.TextColumn("Process Attached"),
+    "apcd_details": st.column_config.TextColumn("APCD Details"),
+    "latitude": st.column_config.NumberColumn("Latitude", min_value=LATITUDE_RANGE[0], max_value=LATITUDE_RANGE[1],
+                                              format="%.6f"),
+    "longitude": st.column_config.NumberColumn("Longitude", min_value=LONGITUDE_RANGE[0],
+                                               max_value=LONGITUDE_RANGE[1], format="%.6f"),
+    "stack_condition": st.column_config.SelectboxColumn("Stack Condition", options=["Wet", "Dry"], required=True),
+    "stack_shape": st.column_config.SelectboxColumn("Circular/Rectangular", options=["Circular", "Rectangular"],
+                                                    required=True),
+    "diameter": st.column_config.NumberColumn("Diameter (in meters)", min_value=0.0, format="%.2f",
+                                              help="Circular stacks only"),
+    "length": st.column_config.NumberColumn("Length (in meters)", min_value=0.0, format="%.2f",
+                                            help="Rectangular stacks only"),
+    "width": st.column_config.NumberColumn("Width (in meters)", min_value=0.0, format="%.2f",
+                                           help="Rectangular stacks only"),
+    "stack_material": st.column_config.TextColumn("Stack Construction Material"),
+    "stack_height": st.column_config.NumberColumn("Stack Height (in meters)", min_value=0.0, format="%.2f"),
+    "platform_height": st.column_config.NumberColumn("Platform Height (in meters)", min_value=0.0, format="%.2f",
+                                                     help="Manual monitoring platform height from ground level"),
+    "platform_approachable": st.column_config.SelectboxColumn("Is Platform approachable?", options=["Yes", "No"],
+                                                              required=True),
+    "approaching_media": st.column_config.SelectboxColumn("Approaching Media", options=["Ladder", "Lift", "Staircase"]),
+    "cems_installed": st.column_config.SelectboxColumn("Where is CEMS Installed?",
+                                                       options=["Stack/Chimney", "Duct", "Both"], required=True),
+    "stack_params": st.column_config.MultiselectColumn("Parameters Monitored in Stack", options=parameter_options,
+                                                       help="Only when CEMS is installed in both"),
+    "duct_params": st.column_config.MultiselectColumn("Parameters Monitored in Duct", options=parameter_options,
+                                                      help="Only when CEMS is installed in both"),
+    "follows_formula": st.column_config.SelectboxColumn(
+        "Follows 8D/2D or (2LW/L+W) criteria?", options=["Yes", "No"], required=True,
+        help="8D/2D formula for circular stacks, (2LW/L+W) criteria for rectangular ones"),
+    "manual_port_installed": st.column_config.SelectboxColumn(
+        "Manual Monitoring Port in duct?", options=["Yes", "No"], help="Only when CEMS is installed in a duct"),
+    "cems_below_manual": st.column_config.SelectboxColumn(
+        "CEMS at least 500mm below Manual monitoring point?", options=["Yes", "No"], required=True),
+    "parameters": st.column_config.MultiselectColumn("Parameters Monitored", options=parameter_options + ["others"]),
+}
+# Rows with none of these filled in are left for later instead of being rejected
+IDENTIFYING_COLUMNS = ["stack_identity", "process_attached"]
+# The multiselect columns, stored as comma-separated lists
+LIST_COLUMNS = ["stack_params", "duct_params", "parameters"]
+
+
+def empty_grid(first_stack, total_stacks):
+    """One row per remaining stack, numbered from `first_stack`, with the old form's defaults."""
+    numbers = range(first_stack, total_stacks + 1)
+    grid = pd.DataFrame({column: [None] * len(numbers) for column in STACK_GRID_COLUMNS},
+                        index=pd.Index(numbers, name="stack"), dtype=object)
+    for column in ("latitude", "longitude", "diameter", "length", "width", "stack_height", "platform_height"):
+        grid[column] = float("nan")
+    grid["stack_condition"], grid["stack_shape"] = "Wet", "Circular"
+    grid["platform_approachable"], grid["approaching_media"] = "Yes", "Ladder"
+    grid["cems_installed"], grid["manual_port_installed"] = "Stack/Chimney", "Yes"
+    grid["follows_formula"] = grid["cems_below_manual"] = "Yes"
+    return grid
+
+
+def _joined(value):
+    """Joins a multiselect cell into a comma-separated list."""
+    if value is None or isinstance(value, (str, float)):
+        return value
+    return ",".join(value)
+
+
+@timed_page
+def fill_stacks(user_id):
+    """Form to fill stack details."""
+    total_stacks, completed_stacks, state_ocmms_id = get_stack_progress(user_id)
+    # Stacks still waiting in the journal count as filled, so they are not asked for again
+    journal = get_journal()
+    completed_stacks += len(journal.pending(user_id, "stack"))
+    completed_stacks += sum(len(batch["stacks"]) for batch in journal.pending(user_id, "stack_batch"))
+    if completed_stacks >= total_stacks:
+        st.success("All stack details are completed.")
+        return
+
+    first_stack = completed_stacks + 1
+    if first_stack == total_stacks:
+        st.subheader(f"Enter Details for Stack {total_stacks} of {total_stacks}")
+    else:
+        st.subheader(f"Enter Details for Stacks {first_stack} to {total_stacks} of {total_stacks}")
+    # New stacks may not reuse the identity of one already saved for the industry, looked up by its
+    # State OCMMS ID
+    stack_grid(user_id, state_ocmms_id, first_stack, total_stacks)
+
+
+@st.fragment
+@timed_page
+def stack_grid(user_id, state_ocmms_id, first_stack, total_stacks):
+    """A grid with one row per remaining stack. Runs as a fragment, so a submit that fails validation
+    reruns only the grid and not the progress lookup above."""
+    st.caption("Fill in one row per stack. Rows without a Stack Identity or Process Attached are left for later. "
+               "Diameter is needed for circular stacks, Length and Width for rectangular ones.")
+    with phase("pandas"):
+        grid = empty_grid(first_stack, total_stacks)
+    with st.form(f"stack_form_{first_stack}_{total_stacks}"):
+        # Keyed on the remaining stacks, so edits never land on the wrong rows once some are saved
+        edited = st.data_editor(
+            grid,
+            key=f"stack_grid_{first_stack}_{total_stacks}",
+            num_rows="fixed",
+            column_config={"_index": st.column_config.NumberColumn("Stack", format="%d"), **STACK_GRID_COLUMNS},
+        )
+        submit_stacks = st.form_submit_button("Submit Stack Details")
+
+    if not submit_stacks:
+        return
+
+    # Validate every entered row together, with the same rules as the bulk import
+    with phase("pandas"):
+        edited = edited.reset_index()
+        for column in LIST_COLUMNS:
+            edited[column] = edited[column].map(_joined)
+        edited = edited.map(as_text)
+        entered = edited[edited[IDENTIFYING_COLUMNS].notna().any(axis=1)].copy()
+    if entered.empty:
+        st.error("Please fill in the details of at least one stack.")
+        return
+    with phase("pandas"):
+        # Drop the cells that do not apply to a row, as the single-stack form never asked for them
+        circular = entered["stack_shape"] == "Circular"
+        entered.loc[circular, ["length", "width"]] = None
+        entered.loc[~circular, "diameter"] = None
+        entered.loc[entered["platform_approachable"] == "No", "approaching_media"] = None
+        entered.loc[entered["cems_installed"] != "Both", ["stack_params", "duct_params"]] = None
+        entered.loc[entered["cems_installed"] == "Stack/Chimney", "manual_port_installed"] = None
+        labels = {column: config["label"] for column, config in STACK_GRID_COLUMNS.items()}
+        check = validate_stacks(entered, labels, state_ocmms_id)
+        stacks = check.df.drop(columns="stack").to_dict("records")
+    submit_grid(check, "Stack " + entered["stack"].astype(str), "stack_batch", user_id, {"stacks": stacks},
+                "Stack details", entered["stack_identity"])
+
+
+fill_stacks(st.session_state["user_id"])
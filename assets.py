@@ -0,0 +1,34 @@
+import html
+import json
+from pathlib import Path
+
+import streamlit as st
+
+MANIFEST = Path(__file__).parent / "static" / "manifest.json"
+
+
+@st.cache_resource
+def load_manifest():
+    """Returns the asset manifest written by build_assets.py, or {} if the assets were not built."""
+    try:
+        return json.loads(MANIFEST.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def show_image(name, fallback, alt=""):
+    """Renders a built asset as a plain <img> served from app/static.
+
+    The browser fetches it once and revalidates it by ETag, instead of the image being read, hashed and
+    registered as a media file on every rerun like st.image does. Falls back to st.image on the
+    `fallback` source file when build_assets.py has not been run.
+    """
+    asset = load_manifest().get(name)
+    if asset is None:
+        st.image(fallback)
+        return
+    st.markdown(
+        f'<img src="app/static/{asset["file"]}" width="{asset["width"]}" height="{asset["height"]}" '
+        f'alt="{html.escape(alt)}">',
+        unsafe_allow_html=True,
+    )
@@ -0,0 +1,16 @@
+"""Offline benchmarks: a synthetic registry generator and timings of the app's hot paths.
+
+Everything runs against a local SQLite file, never the hosted database. The app modules read their
+settings from the environment when first imported, so `use_database` must be called before any of
+them (db, repository, ...) is imported.
+"""
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_database(path):
+    """Points the app at the local SQLite database `path` and keeps the submission journal in memory."""
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = path
+    os.environ["JOURNAL_PATH"] = ":memory:"
@@ -0,0 +1,156 @@
+"""Synthetic registry generator.
+
+Industries are spread over the real district and category lists, and every one of them gets
+`stacks` filled stacks monitoring `parameters` parameters each, of which a `cems_filled` share
+already have CEMS details. Rows go in through the repository's bulk functions, so the triggers and
+counters end up exactly as the forms would leave them.
+
+    python -m benchmarks.generate registry.db --industries 10000 --stacks 3 --parameters 4
+"""
+import argparse
+import os
+import random
+import sys
+
+from benchmarks import use_database
+
+BATCH_SIZE = 2000  # Industries written per transaction
+PROCESSES = ["Kiln", "Boiler", "DG Set", "Furnace", "Cooler", "Cement Mill", "Coal Mill", "Turbine", "Dryer"]
+NAME_WORDS = ["Bihar", "Ganga", "Magadh", "Mithila", "Sone", "Kosi", "Vaishali", "Nalanda", "Champaran"]
+
+
+def synthetic_registration(number, stacks, rng, password_hash):
+    """Returns a bulk_register_industries dict for industry `number`."""
+    from utils import category, dist
+
+    industry_category = rng.choice(category)
+    return {
+        "email": f"industry{number}@example.com",
+        "password_hash": password_hash,
+        "industry_category": industry_category,
+        "state_ocmms_id": f"OCMMS{number:07d}",
+        "cpcb_ind_code": f"CPCB{number:07d}",
+        "industry_name": f"{rng.choice(NAME_WORDS)} {industry_category} Works {number}",
+        "address": f"Plot {number}, Industrial Area",
+        "state": "Bihar",
+        "district": rng.choice(dist),
+        "production_capacity": f"{rng.randint(10, 5000)} TPD",
+        "num_stacks": stacks,
+        "industry_environment_head": f"Environment Head {number}",
+        "env_phone": 9000000000 + number,
+        "industry_instrument_head": f"Instrument Head {number}",
+        "inst_phone": 8000000000 + number,
+        "concerned_person_cems": f"CEMS Contact {number}",
+        "cems_phone": 7000000000 + number,
+    }
+
+
+def synthetic_stack(user_id, number, parameters, rng):
+    """Returns a bulk_save_stacks dict for the `number`th stack of an industry."""
+    from utils import LATITUDE_RANGE, LONGITUDE_RANGE, parameter_options
+
+    circular = rng.random() < 0.8
+    stack_height = round(rng.uniform(30, 275), 2)
+    return {
+        "user_id": user_id,
+        "stack_identity": f"S{number}",
+        "process_attached": f"{rng.choice(PROCESSES)} {number}",
+        "apcd_details": rng.choice(["ESP", "Bag Filter", "Wet Scrubber", "Cyclone"]),
+        "latitude": round(rng.uniform(*LATITUDE_RANGE), 6),
+        "longitude": round(rng.uniform(*LONGITUDE_RANGE), 6),
+        "stack_condition": rng.choice(["Wet", "Dry"]),
+        "stack_shape": "Circular" if circular else "Rectangular",
+        "diameter": round(rng.uniform(1, 8), 2) if circular else None,
+        "length": None if circular else round(rng.uniform(1, 6), 2),
+        "width": None if circular else round(rng.uniform(1, 6), 2),
+        "stack_material": rng.choice(["RCC", "MS", "Brick"]),
+        "stack_height": stack_height,
+        "platform_height": round(stack_height * rng.uniform(0.3, 0.7), 2),
+        "platform_approachable": "Yes",
+        "approaching_media": rng.choice(["Ladder", "Lift", "Staircase"]),
+        "cems_installed": "Stack/Chimney",
+        "stack_params": None,
+        "duct_params": None,
+        "follows_formula": "Yes",
+        "manual_port_installed": None,
+        "cems_below_manual": "Yes",
+        "parameters": ",".join(rng.sample(parameter_options, parameters)),
+    }
+
+
+def synthetic_cems(user_id, stack_id, parameter, rng):
+    """Returns a bulk_save_cems dict for one monitored parameter."""
+    high = rng.choice([100, 500, 1000, 2000])
+    return {
+        "user_id": user_id,
+        "stack_id": stack_id,
+        "parameter": parameter,
+        "make": rng.choice(["Sick", "Siemens", "ABB", "Horiba", "Thermo"]),
+        "model": f"M{rng.randint(100, 999)}",
+        "serial_number": f"SN{stack_id:08d}{parameter}",
+        "emission_limit": round(high * rng.uniform(0.1, 0.5)),
+        "measuring_range_low": 0,
+        "measuring_range_high": high,
+        "certified": "Yes",
+        "certification_agency": rng.choice(["TUV", "MCERTS", "QAL1"]),
+        "communication_protocol": rng.choice(["4-20 mA", "RS-485", "RS-232"]),
+        "measurement_method": rng.choice(["In-situ", "Extractive"]),
+        "technology": rng.choice(["NDIR", "UV-DOAS", "Opacity", "Beta Attenuation"]),
+        "connected_bspcb": "Yes",
+        "bspcb_url": "https://example.com/bspcb",
+        "connected_cpcb": "Yes",
+        "cpcb_url": "https://example.com/cpcb",
+    }
+
+
+def generate_registry(industries, stacks=3, parameters=4, cems_filled=0.8, seed=0):
+    """Fills the database the app is configured for with a synthetic registry."""
+    from migrations import ensure_schema
+    from repository import (bulk_register_industries, bulk_save_cems, bulk_save_stacks, find_industries_by_ocmms_id,
+                            find_stacks_by_identity)
+    from utils import hash_password
+
+    ensure_schema()
+    rng = random.Random(seed)
+    password_hash = hash_password("password")
+    for start in range(1, industries + 1, BATCH_SIZE):
+        registrations = [synthetic_registration(number, stacks, rng, password_hash)
+                         for number in range(start, min(start + BATCH_SIZE, industries + 1))]
+        bulk_register_industries(registrations)
+        ocmms_ids = [registration["state_ocmms_id"] for registration in registrations]
+        if not stacks:
+            continue
+
+        user_ids = find_industries_by_ocmms_id(ocmms_ids)
+        bulk_save_stacks([synthetic_stack(user_ids[ocmms_id][0], number, parameters, rng)
+                          for ocmms_id in ocmms_ids for number in range(1, stacks + 1)])
+        instruments = [
+            synthetic_cems(user_id, stack_id, parameter, rng)
+            for entries in find_stacks_by_identity(ocmms_ids).values()
+            for stack_id, user_id, stack_parameters in entries
+            for parameter in stack_parameters
+            if rng.random() < cems_filled
+        ]
+        if instruments:
+            bulk_save_cems(instruments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes a synthetic registry to a new local SQLite database.")
+    parser.add_argument("database", help="SQLite file to create")
+    parser.add_argument("--industries", type=int, default=1000)
+    parser.add_argument("--stacks", type=int, default=3, help="stacks per industry")
+    parser.add_argument("--parameters", type=int, default=4, help="monitored parameters per stack")
+    parser.add_argument("--cems-filled", type=float, default=0.8, help="share of parameters with CEMS details")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if os.path.exists(args.database):
+        parser.error(f"{args.database} already exists")
+
+    use_database(args.database)
+    generate_registry(args.industries, args.stacks, args.parameters, args.cems_filled, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
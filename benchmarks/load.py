@@ -0,0 +1,447 @@
+"""Concurrent-session load test of one Streamlit server process.
+
+Starts `streamlit run main.py` on a free port and drives it with many simulated browser tabs at
+once. Each tab is a websocket client speaking the same protocol as the Streamlit frontend: it sends
+a rerun with its widget values and waits for the script run to finish. (AppTest cannot be used
+here: it swaps a process-wide runtime in and out around every run, so two AppTests cannot run at
+the same time.)
+
+Industry users register, log in, fill all their stacks through the stack grid and the CEMS details
+of each stack through the CEMS grid, then open their dashboard. Admins log in and browse the
+industry list, a search and the analytics page until the last industry user is done. The storage backend is a local
+SQLite stand-in by default, optionally seeded with a synthetic registry from benchmarks.generate.
+
+    python -m benchmarks.load --users 20 --admins 2 --stacks 3 --parameters 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks import ROOT
+
+ADMIN_USERNAME = "loadtest-admin"
+ADMIN_PASSWORD = "loadtest-password"
+SERVER_START_TIMEOUT = 60
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+class LoadTestError(Exception):
+    """Raised when a simulated user's page shows an error or is not where the script expects."""
+
+
+class StreamlitSession:
+    """One browser tab: a websocket to the server and the elements drawn by the last script run."""
+
+    def __init__(self, url):
+        self.url = url
+        self.page_hash = ""
+        self.pages = {}  # Page title -> page script hash, from the last navigation message
+        self.elements = []  # (element type, proto) of the last run, in order
+        self.widgets = {}  # Label, or type for unlabelled widgets like st.data_editor -> (widget type, proto)
+        self.states = {}  # Widget id -> WidgetState set on the current page, sent with every rerun
+        self._ws = None
+
+    async def connect(self):
+        import websockets
+
+        ws_url = self.url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self._ws = await websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self._ws.close()
+
+    def _widget_state(self, label, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_type, proto = self.widgets[label]
+        state = WidgetState(id=proto.id)
+        if widget_type in ("text_input", "selectbox"):
+            state.string_value = value
+        elif widget_type == "number_input":
+            state.double_value = value
+        elif widget_type == "multiselect":
+            state.string_array_value.data[:] = value
+        elif widget_type == "checkbox":
+            state.bool_value = value
+        elif widget_type == "button":
+            state.trigger_value = True
+        elif widget_type == "dataframe":
+            # st.data_editor edits: {"edited_rows": {row position: {column: value}}, "added_rows": [...], ...}
+            state.string_value = json.dumps(value)
+        else:
+            raise LoadTestError(f"Cannot set {widget_type} {label!r}")
+        return state
+
+    async def run(self, page=None, values=None, click=None):
+        """Reruns the script as the browser does after an interaction; returns the seconds it took.
+
+        `page` switches to the page with that title, `values` maps widget labels to new values and
+        `click` is the label of a button to press. Reruns started by st.rerun() are waited for too.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        if page is not None:
+            self.page_hash = self.pages[page]
+            self.states = {}
+        for label, value in (values or {}).items():
+            state = self._widget_state(label, value)
+            self.states[state.id] = state
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = self.page_hash
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        if click is not None:
+            message.rerun_script.widget_states.widgets.append(self._widget_state(click, True))
+        start = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+        await self._receive_run()
+        return time.perf_counter() - start
+
+    async def _receive_run(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            message = ForwardMsg.FromString(await self._ws.recv())
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = message.new_session.page_script_hash
+                self.elements, self.widgets = [], {}
+            elif kind == "navigation":
+                self.pages = {page.page_name: page.page_script_hash for page in message.navigation.app_pages}
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element_type = message.delta.new_element.WhichOneof("type")
+                proto = getattr(message.delta.new_element, element_type)
+                self.elements.append((element_type, proto))
+                if getattr(proto, "id", None):
+                    self.widgets[getattr(proto, "label", None) or element_type] = (element_type, proto)
+            elif kind == "script_finished" and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return
+
+    def alerts(self, alert_format):
+        """Returns the bodies of the st.success/info/warning/error alerts of the last run."""
+        from streamlit.proto.Alert_pb2 import Alert
+
+        return [proto.body for element_type, proto in self.elements
+                if element_type == "alert" and proto.format == Alert.Format.Value(alert_format)]
+
+    def errors(self):
+        return self.alerts("ERROR") + [proto.message for element_type, proto in self.elements
+                                       if element_type == "exception"]
+
+
+class LoadStats:
+    """Step latencies, errors and script runs shared by every simulated user."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = []
+        self.runs = 0
+        self.completed_users = 0
+
+    async def step(self, name, session, **kwargs):
+        """Runs one interaction, records its latency and raises LoadTestError if the page shows an error."""
+        seconds = await session.run(**kwargs)
+        self.latencies.setdefault(name, []).append(seconds)
+        self.runs += 1
+        errors = session.errors()
+        if errors:
+            raise LoadTestError(f"{name}: {errors[0]}")
+
+
+async def industry_user(url, number, run_id, stacks, parameters, think, stats):
+    """Registers an industry, fills all its stacks and CEMS details, then opens the dashboard."""
+    from utils import parameter_options
+
+    session = StreamlitSession(url)
+    await session.connect()
+
+    async def step(name, **kwargs):
+        await stats.step(name, session, **kwargs)
+        await asyncio.sleep(think)
+
+    try:
+        await step("open")
+        await step("navigate", page="Register Industry")
+        email = f"loadtest-{run_id}-{number}@example.com"
+        await step("register", values={
+            "Industry Category": "Cement", "State OCMMS Id": f"LT{run_id}{number:05d}",
+            "CPCB Industry Code": f"LTC{run_id}{number:05d}", "Industry Name": f"Load Test Works {number}",
+            "Address": "Plot 1, Industrial Area", "State": "Bihar", "District": "Patna",
+            "Production Capacity": "100 TPD", "Number of Stacks": stacks,
+            "Environment Department Head": "A", "Environment Department Head Phone Number": 9876543210,
+            "Instrumentation Department Head": "B", "Instrumentation Department Head Phone Number": 9876543211,
+            "Concerned Person for CEMS": "C", "Concerned Person for CEMS Phone Number": 9876543212,
+            "Industry Representative Email Id (used for login)": email, "Password": "password",
+        }, click="Register Industry")
+
+        await step("navigate", page="Login")
+        await step("login", values={"Industry Representative Email Id": email, "Password": "password"}, click="Login")
+        if "Stack Details" not in session.pages:
+            raise LoadTestError("login: still logged out")
+
+        await step("navigate", page="Stack Details")
+        monitored = parameter_options[:parameters]
+        # One grid row per declared stack, all submitted at once
+        rows = {row: {
+            "stack_identity": f"S{row + 1}", "process_attached": f"Kiln {row + 1}", "apcd_details": "ESP",
+            "latitude": 25.5, "longitude": 85.1, "diameter": 3.0, "stack_material": "RCC", "stack_height": 60.0,
+            "platform_height": 30.0, "parameters": monitored,
+        } for row in range(stacks)}
+        await step("stack", values={"dataframe": {"edited_rows": rows, "added_rows": [], "deleted_rows": []}},
+                   click="Submit Stack Details")
+        if "All stack details are completed." not in session.alerts("SUCCESS"):
+            raise LoadTestError("stack: not every stack was saved")
+
+        await step("navigate", page="CEMS Details")
+        for process in list(session.widgets["Select Process"][1].options):
+            await step("navigate", values={"Select Process": process})
+            # One grid row per monitored parameter, all submitted at once
+            rows = {row: {
+                "make": "Sick", "model": "M100", "serial_number": f"SN{row}", "measuring_range_high": 500,
+                "certification_agency": "TUV", "communication_protocol": "RS-485", "measurement_method": "Extractive",
+                "technology": "NDIR", "bspcb_url": "https://example.com", "cpcb_url": "https://example.com",
+            } for row in range(parameters)}
+            await step("cems", values={"dataframe": {"edited_rows": rows, "added_rows": [], "deleted_rows": []}},
+                       click="Submit CEMS Details")
+            if not any("have already been filled" in warning for warning in session.alerts("WARNING")):
+                raise LoadTestError(f"cems: parameters of {process} were not all saved")
+
+        await step("dashboard", page="Industry Dashboard")
+        stats.completed_users += 1
+    except LoadTestError as e:
+        stats.errors.append(f"user {number}: {e}")
+    finally:
+        await session.close()
+
+
+async def admin_user(url, username, password, think, done, stats):
+    """Logs in as an admin and browses the industry list, a search and analytics, at least once and then
+    until `done` is set."""
+    session = StreamlitSession(url)
+    await session.connect()
+    rng = random.Random()
+
+    async def step(name, **kwargs):
+        await stats.step(name, session, **kwargs)
+        await asyncio.sleep(think)
+
+    try:
+        await step("open")
+        await step("navigate", page="Admin Login")
+        await step("admin_login", values={"Username": username, "Password": password}, click="Login as Admin")
+        if "Industry List" not in session.pages:
+            raise LoadTestError("admin_login: still logged out")
+        while True:
+            await step("industry_list", page="Industry List")
+            await step("search", values={"Search Industry": rng.choice(["Works", "Cement", "Load Test", "Steel"])})
+            await step("analytics", page="Analytics")
+            if done.is_set():
+                break
+    except LoadTestError as e:
+        stats.errors.append(f"admin: {e}")
+    finally:
+        await session.close()
+
+
+def server_rss(pid):
+    """Returns the resident memory of process `pid` in bytes, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+async def sample_rss(pid, samples, done):
+    while not done.is_set():
+        rss = server_rss(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+
+async def run_load(url, pid, args, stats):
+    """Runs the industry users and admins against `url`; returns (seconds taken, peak server RSS)."""
+    run_id = time.strftime("%H%M%S")
+    done = asyncio.Event()
+    rss_samples = []
+    sampler = asyncio.create_task(sample_rss(pid, rss_samples, done)) if pid else None
+    admins = [asyncio.create_task(admin_user(url, args.admin_user, args.admin_password, args.think, done, stats))
+              for _ in range(args.admins)]
+
+    async def ramped_user(number):
+        await asyncio.sleep(args.ramp * number / max(args.users, 1))
+        await industry_user(url, number, run_id, args.stacks, args.parameters, args.think, stats)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ramped_user(number) for number in range(args.users)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*admins)
+    if sampler:
+        await sampler
+    return elapsed, max(rss_samples, default=None)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_local_database(path, industries, stacks, parameters):
+    """Creates the stand-in SQLite database, seeded with a synthetic registry, plus the admin account."""
+    from utils import hash_password
+
+    if industries:
+        from benchmarks.run import _copy_database, registry_database
+        _copy_database(registry_database(industries, stacks, parameters), path)
+    # Apply the schema the same way the app does, through a plain sqlite3 connection
+    from migrations import run_migrations
+    conn = sqlite3.connect(path, isolation_level=None)
+    run_migrations(conn)
+    conn.execute("INSERT OR IGNORE INTO admin (username, password) VALUES (?, ?)",
+                 (ADMIN_USERNAME, hash_password(ADMIN_PASSWORD)))
+    conn.close()
+
+
+def start_server(env, log):
+    """Starts `streamlit run main.py` on a free port and waits until it is healthy."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "main.py", "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://localhost:{port}"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The server exited with code {server.returncode}; see {log.name}")
+        try:
+            with urllib.request.urlopen(url + "/_stcore/health", timeout=1):
+                return server, url
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"The server did not become healthy within {SERVER_START_TIMEOUT} seconds")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(p / 100 * len(values)), len(values) - 1)]
+
+
+def report(stats, elapsed, baseline_rss, peak_rss, sessions):
+    """Returns the summary printed at the end, also written out by --json."""
+    steps = {
+        name: {"count": len(values), "p50_ms": round(percentile(values, 50) * 1000, 1),
+               "p95_ms": round(percentile(values, 95) * 1000, 1), "p99_ms": round(percentile(values, 99) * 1000, 1),
+               "mean_ms": round(statistics.mean(values) * 1000, 1)}
+        for name, values in stats.latencies.items()
+    }
+    summary = {
+        "seconds": round(elapsed, 2),
+        "script_runs": stats.runs,
+        "runs_per_second": round(stats.runs / elapsed, 2),
+        "completed_users": stats.completed_users,
+        "users_per_minute": round(stats.completed_users / elapsed * 60, 2),
+        "errors": stats.errors,
+        "steps": steps,
+    }
+    if baseline_rss and peak_rss:
+        summary["server_rss_mb"] = {"baseline": round(baseline_rss / 2 ** 20, 1), "peak": round(peak_rss / 2 ** 20, 1)}
+        summary["rss_per_session_mb"] = round((peak_rss - baseline_rss) / sessions / 2 ** 20, 2)
+    return summary
+
+
+def print_report(summary):
+    print(f"\n{summary['completed_users']} industry users done in {summary['seconds']} s: "
+          f"{summary['runs_per_second']} script runs/s, {summary['users_per_minute']} users/min")
+    if "rss_per_session_mb" in summary:
+        rss = summary["server_rss_mb"]
+        print(f"Server RSS {rss['baseline']} MB idle, {rss['peak']} MB peak, "
+              f"~{summary['rss_per_session_mb']} MB per session")
+    print(f"\n{'step':<16} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, step in summary["steps"].items():
+        print(f"{name:<16} {step['count']:>6} {step['p50_ms']:>9} {step['p95_ms']:>9} {step['p99_ms']:>9}")
+    if summary["errors"]:
+        print(f"\n{len(summary['errors'])} errors, first: {summary['errors'][0]}")
+
+
+async def warm_up(url, args):
+    """Walks one industry user and one admin through every page, so the baseline memory already
+    includes the modules each page imports. Raises LoadTestError if that fails."""
+    stats = LoadStats()
+    done = asyncio.Event()
+    done.set()
+    await asyncio.gather(industry_user(url, 0, f"W{time.strftime('%H%M%S')}", 1, 1, 0, stats),
+                         admin_user(url, args.admin_user, args.admin_password, 0, done, stats))
+    if stats.errors:
+        raise LoadTestError(f"Warm-up failed: {stats.errors[0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drives many concurrent sessions against one Streamlit server.")
+    parser.add_argument("--users", type=int, default=20, help="industry users, all running at once")
+    parser.add_argument("--admins", type=int, default=2, help="admins browsing while the users work")
+    parser.add_argument("--stacks", type=int, default=3, help="stacks each user fills")
+    parser.add_argument("--parameters", type=int, default=4, help="parameters monitored per stack")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which the users start")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds each user waits between interactions")
+    parser.add_argument("--backend", choices=["sqlite", "cloud"], default="sqlite",
+                        help="sqlite: a local stand-in database; cloud: the server's DATABASE_URL (writes real rows)")
+    parser.add_argument("--industries", type=int, default=0,
+                        help="synthetic industries the sqlite stand-in is seeded with")
+    parser.add_argument("--url", help="drive an already running server instead of starting one")
+    parser.add_argument("--admin-user", default=ADMIN_USERNAME)
+    parser.add_argument("--admin-password", default=ADMIN_PASSWORD)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url, pid = args.url, None
+        else:
+            env = dict(os.environ, STORAGE_BACKEND=args.backend, JOURNAL_PATH=os.path.join(tmp, "journal.db"))
+            if args.backend == "sqlite":
+                env["SQLITE_PATH"] = os.path.join(tmp, "registry.db")
+                prepare_local_database(env["SQLITE_PATH"], args.industries, 3, 4)
+            log = open(os.path.join(tmp, "server.log"), "w")
+            server, url = start_server(env, log)
+            pid = server.pid
+        try:
+            asyncio.run(warm_up(url, args))
+            baseline_rss = server_rss(pid) if pid else None
+            stats = LoadStats()
+            elapsed, peak_rss = asyncio.run(run_load(url, pid, args, stats))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+                log.close()
+
+    summary = report(stats, elapsed, baseline_rss, peak_rss, args.users + args.admins)
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Times the app's hot paths against synthetic registries of increasing size.
+
+Each scale gets its own generated database, kept under benchmarks/data/ and copied fresh for every
+run, and its own worker process, since the app reads its database settings when first imported.
+Pages are timed as full headless reruns with Streamlit's AppTest; submissions go through the
+journal and wait for the worker to reach the database, as a form does. Results are appended to
+benchmarks/results.jsonl under the current commit and compared with the last run of another commit.
+
+    python -m benchmarks.run --scales 100 10000 100000 --repeat 20
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import ROOT, use_database
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results.jsonl")
+DEFAULT_SCALES = [100, 10000, 100000]
+# A median this much slower than the baseline's is reported as a regression
+REGRESSION_THRESHOLD = 0.2
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _app(**session_state):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=300)
+    for key, value in session_state.items():
+        app.session_state[key] = value
+    return app
+
+
+def _cold_run(app):
+    """Reruns `app` with an empty read cache, so every page read reaches the database."""
+    from cache import get_read_cache
+
+    get_read_cache().clear()
+    return _timed(app.run)
+
+
+def bench_display_all_details(rng, industries, repeat):
+    app = _app(admin_logged_in=True)
+    app.run()
+    return [_timed(app.run) for _ in range(repeat)]
+
+
+def bench_display_all_details_search(rng, industries, repeat):
+    app = _app(admin_logged_in=True)
+    app.run()
+    # A different name fragment each time, as when typing into the search box
+    return [_timed(app.text_input[0].input(f"Works {rng.randint(1, industries)}").run) for _ in range(repeat)]
+
+
+def bench_show_industry_details(rng, industries, repeat):
+    app = _app(admin_logged_in=True)
+    app.run()
+    durations = []
+    for _ in range(repeat):
+        app.session_state["selected_ind_id"] = rng.randint(1, industries)
+        durations.append(_cold_run(app))
+    return durations
+
+
+def bench_show_industry_dashboard(rng, industries, repeat):
+    app = _app(logged_in=True, user_id=1)
+    app.run()
+    durations = []
+    for _ in range(repeat):
+        app.session_state["user_id"] = rng.randint(1, industries)
+        durations.append(_cold_run(app))
+    return durations
+
+
+def _submit(kind, user_id, payload):
+    from journal import DONE, submit_and_wait
+
+    submission = submit_and_wait(kind, user_id, payload)
+    if submission["status"] != DONE:
+        raise RuntimeError(f"{kind} submission ended {submission['status']}: {submission['last_error']}")
+
+
+def bench_registration(rng, industries, repeat):
+    from benchmarks.generate import synthetic_registration
+    from utils import hash_password
+
+    password_hash = hash_password("password")
+    durations = []
+    for number in range(industries + 1, industries + repeat + 1):
+        registration = synthetic_registration(number, 3, rng, password_hash)
+        email = registration.pop("email")
+        payload = {"email": email, "password_hash": registration.pop("password_hash"), "industry": registration}
+        durations.append(_timed(_submit, "registration", None, payload))
+    return durations
+
+
+def bench_stack_submit(rng, industries, repeat):
+    from benchmarks.generate import synthetic_stack
+
+    # Three stacks per submission, entered together in the stack grid
+    durations = []
+    for number in range(repeat):
+        user_id = rng.randint(1, industries)
+        stacks = [synthetic_stack(user_id, 100 + 3 * number + row, 4, rng) for row in range(3)]
+        for stack in stacks:
+            del stack["user_id"]
+        durations.append(_timed(_submit, "stack_batch", user_id, {"stacks": stacks}))
+    return durations
+
+
+def bench_cems_submit(rng, industries, repeat):
+    from benchmarks.generate import synthetic_cems, synthetic_stack
+    from db import get_database_connection
+    from repository import save_stack
+    from utils import split_parameters
+
+    # A fresh stack for every submission, whose pending parameters all go in one batch as from the CEMS grid
+    durations = []
+    for number in range(repeat):
+        user_id = rng.randint(1, industries)
+        stack = synthetic_stack(user_id, 200 + number, 4, rng)
+        save_stack(stack.pop("user_id"), stack)
+        with get_database_connection() as conn:
+            stack_id = conn.execute("SELECT stack_id FROM stacks WHERE user_id = ? AND stack_identity = ?",
+                                    (user_id, stack["stack_identity"])).fetchone()[0]
+        instruments = [synthetic_cems(user_id, stack_id, parameter, rng)
+                       for parameter in split_parameters(stack["parameters"])]
+        for cems in instruments:
+            del cems["user_id"], cems["stack_id"]
+        durations.append(_timed(_submit, "cems_batch", user_id, {"stack_id": stack_id, "instruments": instruments}))
+    return durations
+
+
+# Benchmark name -> function(rng, industries, repeat) returning `repeat` durations in seconds
+BENCHMARKS = {
+    "display_all_details": bench_display_all_details,
+    "display_all_details_search": bench_display_all_details_search,
+    "show_industry_details": bench_show_industry_details,
+    "show_industry_dashboard": bench_show_industry_dashboard,
+    "registration_submit": bench_registration,
+    "stack_submit": bench_stack_submit,
+    "cems_submit": bench_cems_submit,
+}
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    return {
+        "repeat": len(durations),
+        "median_ms": round(statistics.median(durations) * 1000, 2),
+        "p95_ms": round(durations[min(int(0.95 * len(durations)), len(durations) - 1)] * 1000, 2),
+        "min_ms": round(durations[0] * 1000, 2),
+    }
+
+
+def run_worker(database, output, industries, repeat, names, seed):
+    """Runs the benchmarks in this process against `database` and writes their summaries to `output`."""
+    use_database(database)
+    # The submissions run outside AppTest, and every cached lookup there warns about the missing script
+    # context; AppTest resets log levels, so silence that one logger outright
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    rng = random.Random(seed)
+    results = {}
+    for name in names:
+        results[name] = summarize(BENCHMARKS[name](rng, industries, repeat))
+        print(f"  {name}: {results[name]['median_ms']} ms", flush=True)
+    with open(output, "w") as f:
+        json.dump(results, f)
+
+
+def registry_database(industries, stacks, parameters):
+    """Returns the path of the generated registry for these sizes, generating it on first use."""
+    path = os.path.join(DATA_DIR, f"registry-{industries}-{stacks}-{parameters}.db")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generating {industries} industries...", flush=True)
+        partial = path + ".partial"
+        for leftover in (partial, partial + "-wal", partial + "-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        subprocess.run([sys.executable, "-m", "benchmarks.generate", partial, "--industries", str(industries),
+                        "--stacks", str(stacks), "--parameters", str(parameters)],
+                       cwd=ROOT, check=True)
+        _copy_database(partial, path)
+        for leftover in (partial, partial + "-wal", partial + "-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return path
+
+
+def _copy_database(source, target):
+    # The backup API copies committed pages still in the WAL file too
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def current_commit():
+    """Returns (short commit hash, whether the working tree has uncommitted changes)."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--untracked-files=no"))
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history, commit, result):
+    """Returns the latest stored result of another commit for the same benchmark and sizes."""
+    for previous in reversed(history):
+        if previous["commit"] != commit and all(previous[key] == result[key] for key in
+                                                 ("benchmark", "industries", "stacks", "parameters")):
+            return previous
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the app's hot paths against synthetic registries.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="numbers of industries")
+    parser.add_argument("--stacks", type=int, default=3, help="stacks per industry")
+    parser.add_argument("--parameters", type=int, default=4, help="monitored parameters per stack")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON-lines file results are appended to")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="median slowdown against the baseline reported as a regression")
+    parser.add_argument("--worker", nargs=2, metavar=("DATABASE", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+
+    if args.worker:
+        run_worker(*args.worker, args.scales[0], args.repeat, names, args.seed)
+        return 0
+
+    commit, dirty = current_commit()
+    history = load_results(args.results)
+    results = []
+    for industries in args.scales:
+        source = registry_database(industries, args.stacks, args.parameters)
+        print(f"{industries} industries:", flush=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            database, output = os.path.join(tmp, "registry.db"), os.path.join(tmp, "results.json")
+            _copy_database(source, database)
+            subprocess.run([sys.executable, "-m", "benchmarks.run", "--worker", database, output,
+                            "--scales", str(industries), "--repeat", str(args.repeat), "--seed", str(args.seed),
+                            "--only", *names], cwd=ROOT, check=True)
+            with open(output) as f:
+                summaries = json.load(f)
+        for name in names:
+            results.append({"commit": commit, "dirty": dirty, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                            "benchmark": name, "industries": industries, "stacks": args.stacks,
+                            "parameters": args.parameters, **summaries[name]})
+
+    with open(args.results, "a") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+    regressions = 0
+    print(f"\n{'benchmark':<28} {'industries':>10} {'median ms':>10} {'p95 ms':>10} {'baseline':>10} {'change':>8}")
+    for result in results:
+        baseline = find_baseline(history, commit, result)
+        line = (f"{result['benchmark']:<28} {result['industries']:>10} {result['median_ms']:>10} "
+                f"{result['p95_ms']:>10}")
+        if baseline:
+            change = result["median_ms"] / baseline["median_ms"] - 1
+            line += f" {baseline['median_ms']:>10} {change:>+8.0%}"
+            if change > args.threshold:
+                line += f"  REGRESSION against {baseline['commit']}"
+                regressions += 1
+        print(line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
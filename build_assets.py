@@ -0,0 +1,65 @@
+"""Resizes the header images and converts them to WebP for static serving.
+
+Run `python build_assets.py` after changing any source image. Outputs go to static/ with a content
+hash in the file name, so a changed image always gets a new URL and browsers can keep the old ones
+cached. static/manifest.json maps each asset name to its current file and size.
+"""
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).parent
+STATIC_DIR = ROOT / "static"
+MANIFEST = STATIC_DIR / "manifest.json"
+
+# Asset name -> (source file, maximum width in pixels or None to keep the size)
+ASSETS = {
+    "bspcb": ("bspcb.png", None),
+    "ceew": ("CEEW.png", None),
+}
+WEBP_QUALITY = 80
+
+
+def convert(source, max_width):
+    """Returns the WebP bytes and (width, height) of a source image, downscaled to `max_width`."""
+    with Image.open(source) as image:
+        image.load()
+    if max_width and image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+    out = io.BytesIO()
+    if image.mode in ("RGBA", "LA", "P"):
+        # Logos: lossless keeps edges and transparency crisp, and they are tiny either way
+        image.save(out, "WEBP", lossless=True, method=6)
+    else:
+        image.convert("RGB").save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    return out.getvalue(), image.size
+
+
+def build():
+    STATIC_DIR.mkdir(exist_ok=True)
+    manifest = {}
+    for name, (source, max_width) in ASSETS.items():
+        data, (width, height) = convert(ROOT / source, max_width)
+        file_name = f"{name}.{hashlib.sha256(data).hexdigest()[:10]}.webp"
+        # Drop the outputs of earlier builds of this asset
+        for old in STATIC_DIR.glob(f"{name}.*.webp"):
+            if old.name != file_name:
+                old.unlink()
+        (STATIC_DIR / file_name).write_bytes(data)
+        manifest[name] = {"file": file_name, "width": width, "height": height}
+        print(f"{source}: {(ROOT / source).stat().st_size // 1024} KB -> {file_name}: {len(data) // 1024} KB")
+    # Drop the outputs of assets no longer listed
+    built = {asset["file"] for asset in manifest.values()}
+    for old in STATIC_DIR.glob("*.webp"):
+        if old.name not in built:
+            old.unlink()
+    MANIFEST.write_text(json.dumps(manifest, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build())
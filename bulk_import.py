@@ -0,0 +1,301 @@
+"""Bulk import of industries, stacks and CEMS instruments from CSV or XLSX files.
+
+Files are read in chunks, each chunk is validated column-wise with the same rules as the forms,
+and the valid rows of a chunk are written with batched INSERTs in one transaction. Rejected rows
+are collected into a per-row error report.
+"""
+from itertools import islice
+
+import pandas as pd
+
+from repository import (CEMS_FORM_COLUMNS, REGISTRATION_COLUMNS, STACK_FORM_COLUMNS, bulk_register_industries,
+                        bulk_save_cems, bulk_save_stacks, find_industries_by_ocmms_id, find_registration_conflicts,
+                        find_stacks_by_identity)
+from utils import (EMAIL_REGEX, LATITUDE_RANGE, LONGITUDE_RANGE, PHONE_REGEX, category, dist, hash_password,
+                   parameter_options, split_parameters, state_list)
+
+CHUNK_SIZE = 1000
+
+# Import type -> columns expected in the file
+IMPORT_COLUMNS = {
+    "Industries": REGISTRATION_COLUMNS + ["email", "password"],
+    "Stacks": ["state_ocmms_id"] + STACK_FORM_COLUMNS,
+    "CEMS Instruments": ["state_ocmms_id", "stack_identity"] + CEMS_FORM_COLUMNS,
+}
+
+
+class ImportFileError(Exception):
+    """Raised when an uploaded file cannot be imported at all, e.g. because columns are missing."""
+
+
+def as_text(value):
+    """Normalizes a cell to a stripped string, or None when blank."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Phone numbers and counts typed into Excel come back as floats
+    text = str(value).strip()
+    return text or None
+
+
+def read_chunks(file, file_name, chunk_size=CHUNK_SIZE):
+    """Yields DataFrames of at most `chunk_size` rows with every cell as text or None."""
+    if file_name.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook  # Only needed for Excel uploads
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [as_text(name) for name in next(rows, ())]
+        while batch := list(islice(rows, chunk_size)):
+            yield pd.DataFrame(batch, columns=header).map(as_text)
+        workbook.close()
+    else:
+        for chunk in pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            chunk.columns = [column.strip() for column in chunk.columns]
+            yield chunk.map(as_text)
+
+
+class _Validator:
+    """Collects per-row error messages for one chunk using column-wise checks."""
+
+    def __init__(self, df, labels=None):
+        self.df = df
+        self.errors = pd.Series("", index=df.index)
+        self.labels = labels or {}  # Column -> name used in messages; the column name itself by default
+
+    def name(self, column):
+        return self.labels.get(column, column)
+
+    def flag(self, mask, message):
+        mask = mask.fillna(False).astype(bool)
+        self.errors[mask] += message + "; "
+
+    def required(self, columns):
+        for column in columns:
+            self.flag(self.df[column].isna(), f"{self.name(column)} is required")
+
+    def one_of(self, column, options):
+        self.flag(self.df[column].notna() & ~self.df[column].isin(options),
+                  f"{self.name(column)} must be one of {', '.join(options)}")
+
+    def number(self, column, minimum=None, maximum=None):
+        """Converts a column to numbers in place, flagging values that are not numbers or out of range."""
+        values = pd.to_numeric(self.df[column], errors="coerce")
+        self.flag(self.df[column].notna() & values.isna(), f"{self.name(column)} must be a number")
+        if minimum is not None:
+            self.flag(values < minimum, f"{self.name(column)} must be at least {minimum}")
+        if maximum is not None:
+            self.flag(values > maximum, f"{self.name(column)} must be at most {maximum}")
+        self.df[column] = values.astype(object).where(values.notna(), None)
+        return values
+
+    def matches(self, column, regex, message):
+        self.flag(self.df[column].notna() & ~self.df[column].str.fullmatch(regex, na=False), message)
+
+    def duplicated(self, columns, message):
+        self.flag(self.df.duplicated(columns, keep="first") & self.df[columns].notna().all(axis=1), message)
+
+    @property
+    def valid(self):
+        return self.errors == ""
+
+
+def _import_industries(df):
+    check = _Validator(df)
+    check.required([column for column in IMPORT_COLUMNS["Industries"] if column != "cpcb_ind_code"])
+    check.one_of("industry_category", category)
+    check.one_of("state", state_list)
+    check.one_of("district", dist)
+    num_stacks = check.number("num_stacks", minimum=1)
+    check.flag(num_stacks.notna() & (num_stacks % 1 != 0), "num_stacks must be a whole number")
+    for column in ("env_phone", "inst_phone", "cems_phone"):
+        check.matches(column, PHONE_REGEX, f"{column} must be a valid mobile number")
+    check.matches("email", EMAIL_REGEX, "email is not a valid email address")
+
+    for column, label in (("email", "Email"), ("state_ocmms_id", "State OCMMS ID"),
+                          ("cpcb_ind_code", "CPCB Industry code")):
+        check.duplicated([column], f"{label} appears more than once in the file")
+    conflicts = find_registration_conflicts(df["email"].dropna(), df["state_ocmms_id"].dropna(),
+                                            df["cpcb_ind_code"].dropna())
+    check.flag(df["email"].isin(conflicts["email"]), "Email already exists.")
+    check.flag(df["state_ocmms_id"].isin(conflicts["state_ocmms_id"]), "State OCMMS ID already exists.")
+    check.flag(df["cpcb_ind_code"].isin(conflicts["cpcb_ind_code"]), "CPCB Industry code already exists.")
+
+    valid = df[check.valid]
+    if not valid.empty:
+        registrations = valid.to_dict("records")
+        for registration in registrations:
+            registration["num_stacks"] = int(registration["num_stacks"])
+            registration["password_hash"] = hash_password(registration.pop("password"))
+            for column in ("env_phone", "inst_phone", "cems_phone"):
+                registration[column] = int(registration[column])
+        bulk_register_industries(registrations)
+    return check.errors
+
+
+def validate_stacks(df, labels=None, state_ocmms_id=None):
+    """Checks STACK_FORM_COLUMNS of every row with the stack form's rules; returns the _Validator.
+
+    Shared by the import and the stack details grid. Rows belong to the industry in their
+    state_ocmms_id column, or to `state_ocmms_id` when there is none (the grid), and may not reuse a
+    stack identity of that industry. Numeric columns are converted and parameter lists normalized
+    in place.
+    """
+    check = _Validator(df, labels)
+    owners = df["state_ocmms_id"] if "state_ocmms_id" in df else pd.Series(state_ocmms_id, index=df.index)
+    keys = pd.DataFrame({"owner": owners, "stack_identity": df["stack_identity"]})
+    named = keys.notna().all(axis=1)
+    check.flag(named & keys.duplicated(keep="first"),
+               f"{check.name('stack_identity')} is used by another row for the same industry")
+    taken = find_stacks_by_identity(owners[named].unique())
+    check.flag(pd.Series([key in taken for key in zip(owners, df["stack_identity"])], index=df.index),
+               f"The industry already has a stack with this {check.name('stack_identity')}")
+    optional = {"diameter", "length", "width", "approaching_media", "stack_params", "duct_params",
+                "manual_port_installed"}
+    check.required([column for column in STACK_FORM_COLUMNS if column not in optional])
+    check.number("latitude", *LATITUDE_RANGE)
+    check.number("longitude", *LONGITUDE_RANGE)
+    check.one_of("stack_condition", ["Wet", "Dry"])
+    check.one_of("stack_shape", ["Circular", "Rectangular"])
+    for column in ("diameter", "length", "width"):
+        check.number(column, minimum=0)
+    stack_height = check.number("stack_height", minimum=0)
+    platform_height = check.number("platform_height", minimum=0)
+    circular = df["stack_shape"] == "Circular"
+    check.flag(circular & df["diameter"].isna(), f"{check.name('diameter')} is required for a circular stack")
+    check.flag(~circular & (df["length"].isna() | df["width"].isna()),
+               f"{check.name('length')} and {check.name('width')} are required for a rectangular stack")
+    check.flag(platform_height >= stack_height,
+               "Platform height cannot be greater than or equal to stack height")
+    check.one_of("platform_approachable", ["Yes", "No"])
+    check.one_of("approaching_media", ["Ladder", "Lift", "Staircase"])
+    check.flag((df["platform_approachable"] == "Yes") & df["approaching_media"].isna(),
+               f"{check.name('approaching_media')} is required when the platform is approachable")
+    check.one_of("cems_installed", ["Stack/Chimney", "Duct", "Both"])
+    both = df["cems_installed"] == "Both"
+    check.flag(both & (df["stack_params"].isna() | df["duct_params"].isna()),
+               f"{check.name('stack_params')} and {check.name('duct_params')} are required when CEMS is "
+               "installed in both")
+    for column in ("follows_formula", "cems_below_manual"):
+        check.one_of(column, ["Yes", "No"])
+    check.one_of("manual_port_installed", ["Yes", "No"])
+
+    parameters = df["parameters"].map(split_parameters)
+    allowed = set(parameter_options + ["others"])
+    check.flag(parameters.map(lambda values: any(value not in allowed for value in values)),
+               f"{check.name('parameters')} must be chosen from {', '.join(parameter_options)}, others")
+    df["parameters"] = parameters.map(lambda values: ",".join(values) or None)
+    return check
+
+
+def _import_stacks(df, stacks_added):
+    check = validate_stacks(df)
+    check.required(["state_ocmms_id"])
+
+    # Resolve the owning industry and keep within its declared number of stacks
+    industries = find_industries_by_ocmms_id(df["state_ocmms_id"].dropna().unique())
+    check.flag(df["state_ocmms_id"].notna() & ~df["state_ocmms_id"].isin(industries.keys()),
+               "No industry is registered with this state_ocmms_id")
+    stacks = []
+    for index, row in df[check.valid].iterrows():
+        user_id, num_stacks, filled = industries[row["state_ocmms_id"]]
+        if filled + stacks_added.get(user_id, 0) >= num_stacks:
+            check.errors[index] += f"Industry already has all {num_stacks} declared stacks; "
+            continue
+        stacks_added[user_id] = stacks_added.get(user_id, 0) + 1
+        stack = {column: row[column] for column in STACK_FORM_COLUMNS}
+        stack["user_id"] = user_id
+        stacks.append(stack)
+    if stacks:
+        bulk_save_stacks(stacks)
+    return check.errors
+
+
+def validate_cems(df, labels=None):
+    """Checks CEMS_FORM_COLUMNS of every row with the CEMS form's rules; returns the _Validator.
+
+    Shared by the import and the CEMS details grid. Numeric columns are converted in place.
+    """
+    check = _Validator(df, labels)
+    optional = {"certification_agency", "bspcb_url", "cpcb_url"}
+    check.required([column for column in CEMS_FORM_COLUMNS if column not in optional])
+    check.number("emission_limit", minimum=0)
+    low = check.number("measuring_range_low", minimum=0)
+    high = check.number("measuring_range_high", minimum=0)
+    check.flag(low >= high,
+               f"{check.name('measuring_range_low')} must be less than {check.name('measuring_range_high')}")
+    check.one_of("communication_protocol", ["4-20 mA", "RS-485", "RS-232"])
+    check.one_of("measurement_method", ["In-situ", "Extractive"])
+    for flag, detail in (("certified", "certification_agency"), ("connected_bspcb", "bspcb_url"),
+                         ("connected_cpcb", "cpcb_url")):
+        check.one_of(flag, ["Yes", "No"])
+        check.flag((df[flag] == "Yes") & df[detail].isna(),
+                   f"{check.name(detail)} is required when {check.name(flag)} is Yes")
+    return check
+
+
+def _import_cems(df):
+    check = validate_cems(df)
+    check.required(["state_ocmms_id", "stack_identity"])
+    check.duplicated(["state_ocmms_id", "stack_identity", "parameter"],
+                     "This parameter appears more than once for the stack in the file")
+
+    # Resolve the stack and make sure the parameter is monitored there and still pending
+    stacks = find_stacks_by_identity(df["state_ocmms_id"].dropna().unique())
+    instruments = []
+    for index, row in df[check.valid].iterrows():
+        matches = stacks.get((row["state_ocmms_id"], row["stack_identity"]), [])
+        if len(matches) != 1:
+            check.errors[index] += ("No stack with this stack_identity for the industry; " if not matches else
+                                    "More than one stack has this stack_identity; ")
+            continue
+        stack_id, user_id, parameters = matches[0]
+        if row["parameter"] not in parameters:
+            check.errors[index] += f"{row['parameter']} is not monitored on this stack; "
+        elif parameters[row["parameter"]]:
+            check.errors[index] += f"CEMS details for {row['parameter']} have already been filled; "
+        else:
+            instrument = {column: row[column] for column in CEMS_FORM_COLUMNS}
+            instrument.update(stack_id=stack_id, user_id=user_id)
+            instruments.append(instrument)
+    if instruments:
+        bulk_save_cems(instruments)
+    return check.errors
+
+
+def import_file(kind, file, file_name, chunk_size=CHUNK_SIZE, on_progress=None):
+    """Imports a CSV or XLSX file of `kind` (a key of IMPORT_COLUMNS) chunk by chunk.
+
+    Each chunk commits on its own, so a failure midway keeps the chunks before it. Returns the
+    number of imported rows and a DataFrame with one line per rejected row, numbered as in the
+    file with the header on row 1. `on_progress(rows_read)` is called after every chunk.
+    """
+    expected = IMPORT_COLUMNS[kind]
+    stacks_added = {}  # user_id -> stacks imported so far, to enforce num_stacks across chunks
+    imported, rows_read, report = 0, 0, []
+    for chunk in read_chunks(file, file_name, chunk_size):
+        missing = [column for column in expected if column not in chunk.columns]
+        if missing:
+            raise ImportFileError(f"The file is missing these columns: {', '.join(missing)}")
+        chunk = chunk[expected].copy()
+        chunk.index = range(rows_read + 2, rows_read + 2 + len(chunk))
+
+        if kind == "Industries":
+            errors = _import_industries(chunk)
+        elif kind == "Stacks":
+            errors = _import_stacks(chunk, stacks_added)
+        else:
+            errors = _import_cems(chunk)
+
+        rejected = errors[errors != ""]
+        imported += len(chunk) - len(rejected)
+        report.extend((row, message.rstrip("; ")) for row, message in rejected.items())
+        rows_read += len(chunk)
+        if on_progress:
+            on_progress(rows_read)
+    return imported, pd.DataFrame(report, columns=["row", "errors"])
+
+
+def template_csv(kind):
+    """Returns an empty CSV with the header row expected for `kind`."""
+    return (",".join(IMPORT_COLUMNS[kind]) + "\n").encode()
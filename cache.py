@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+READ_CACHE_TTL = float(os.environ.get("READ_CACHE_TTL", "300"))
+READ_CACHE_SIZE = int(os.environ.get("READ_CACHE_SIZE", "2048"))
+
+MISSING = object()
+
+
+class ReadCache:
+    """A thread-safe LRU cache with a TTL whose entries are tagged with the owning industry user_id.
+
+    Every entry for an industry (dashboard report, stack progress, CEMS lookups) is tagged with its
+    user_id, so a write can drop exactly that industry's entries with `invalidate(user_id)`.
+
+    A reader can query the database before a write commits and only call `put` after the write has
+    invalidated. To keep such a stale value out, readers take `generation(owner)` before the query
+    and hand it to `put`, which drops the value if the owner was invalidated in between.
+    """
+
+    def __init__(self, max_entries=READ_CACHE_SIZE, ttl=READ_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, owner, value), least recently used first
+        self._keys_by_owner = {}
+        self._generations = {}  # owner -> number of invalidations; None counts every invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached value for `key`, or MISSING if it is absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def generation(self, owner=None):
+        """Returns a token to take before reading the database and pass to `put`. Without an owner
+        (when it is only known from the result) any invalidation makes the token stale."""
+        with self._lock:
+            return owner, self._generations.get(owner, 0)
+
+    def put(self, key, value, owner, generation=None):
+        """Caches `value` for `key`, unless `generation` shows the owner was invalidated since."""
+        with self._lock:
+            if generation is not None and self._generations.get(generation[0], 0) != generation[1]:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, owner, value)
+            self._keys_by_owner.setdefault(owner, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, owner):
+        """Drops every entry belonging to the industry owned by `owner`."""
+        with self._lock:
+            self._generations[owner] = self._generations.get(owner, 0) + 1
+            self._generations[None] = self._generations.get(None, 0) + 1
+            for key in list(self._keys_by_owner.get(owner, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._generations[None] = self._generations.get(None, 0) + 1
+            self._entries.clear()
+            self._keys_by_owner.clear()
+
+    def _remove(self, key):
+        _, owner, _ = self._entries.pop(key)
+        keys = self._keys_by_owner[owner]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_owner[owner]
+
+
+@st.cache_resource
+def get_read_cache():
+    """Returns the process-wide read cache shared by every session."""
+    return ReadCache()
+
+
+def invalidate_industry(user_id):
+    """Drops the cached reads of one industry; call after every write that touches it."""
+    get_read_cache().invalidate(user_id)
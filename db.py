@@ -0,0 +1,275 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from perf import record_query
+
+# "cloud" for the hosted sqlitecloud database, "sqlite" for a local file or in-memory database
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "cloud")
+DATABASE_URL = os.environ.get(
+    "DATABASE_URL",
+    "sqlitecloud://cqssetgvhz.sqlite.cloud:8860/industry_registration?apikey=v1hNkVAkbMH6JLN7FSU71ARA3aaEodfbuxJ9Cl9HbVQ"
+)
+# Path of the local database for the sqlite backend; ":memory:" keeps it in memory for the process
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "industry_registration.db")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+# Idle connections older than this are pinged before being handed out again
+DB_HEALTH_CHECK_INTERVAL = float(os.environ.get("DB_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class StorageBackend:
+    """Opens connections to one kind of database. Every backend speaks the SQLite dialect."""
+
+    name = None
+    integrity_errors = ()  # Exception types raised when a UNIQUE or FOREIGN KEY constraint fails
+
+    def connect(self):
+        raise NotImplementedError
+
+    def is_integrity_error(self, exc):
+        return isinstance(exc, self.integrity_errors)
+
+    def execute_batch(self, conn, statements):
+        """Runs (sql, params) pairs in order on `conn` and returns the cursor of the last one."""
+        cursor = None
+        for sql, params in statements:
+            cursor = conn.execute(sql, params)
+        return cursor
+
+
+class CloudBackend(StorageBackend):
+    """The hosted sqlitecloud database used in production."""
+
+    name = "cloud"
+
+    def __init__(self, url=DATABASE_URL):
+        # Imported here so the local backend runs without the sqlitecloud driver installed
+        from sqlitecloud.exceptions import SQLiteCloudIntegrityError
+        self.url = url
+        self.integrity_errors = (SQLiteCloudIntegrityError,)
+
+    def connect(self):
+        import sqlitecloud
+        return sqlitecloud.connect(self.url)
+
+    def execute_batch(self, conn, statements):
+        # The server runs a multi-statement command with bound parameters in one round trip; this is
+        # how the driver's own executemany() works
+        sql = "".join(statement.strip().rstrip(";") + ";" for statement, _ in statements)
+        return conn.execute(sql, [value for _, params in statements for value in params])
+
+
+class LocalSQLiteBackend(StorageBackend):
+    """A local sqlite3 database file, or a process-wide in-memory database for ":memory:"."""
+
+    name = "sqlite"
+    integrity_errors = (sqlite3.IntegrityError,)
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        if path == ":memory:":
+            # Pooled connections must all see the same database, so use a named shared-cache memory
+            # database and keep one connection open so it lives as long as the backend
+            self._uri = f"file:industry_registration_{id(self)}?mode=memory&cache=shared"
+            self._keepalive = self.connect()
+        else:
+            self._uri = f"file:{path}"
+            conn = sqlite3.connect(self._uri, uri=True)
+            conn.execute("PRAGMA journal_mode = WAL")  # Readers do not block the single writer
+            conn.close()
+
+    def connect(self):
+        # Autocommit mode like sqlitecloud: transactions are opened explicitly with BEGIN
+        return sqlite3.connect(self._uri, uri=True, isolation_level=None, check_same_thread=False, timeout=30)
+
+
+BACKENDS = {
+    CloudBackend.name: CloudBackend,
+    LocalSQLiteBackend.name: LocalSQLiteBackend,
+}
+
+
+@st.cache_resource
+def get_backend():
+    """Returns the storage backend selected by STORAGE_BACKEND."""
+    try:
+        return BACKENDS[STORAGE_BACKEND]()
+    except KeyError:
+        raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected one of {sorted(BACKENDS)}.") from None
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the pool timeout."""
+
+
+class ConnectionPool:
+    """A fixed-size, thread-safe pool of open database connections."""
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_HEALTH_CHECK_INTERVAL):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()  # (connection, last_used) pairs, most recent first
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "borrows": 0,
+            "hits": 0,  # borrows served by an already open connection
+            "opened": 0,
+            "reconnects": 0,  # connections dropped after a failed health check or error
+            "timeouts": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+        }
+
+    def _open(self):
+        conn = self._connect()
+        conn.execute("PRAGMA foreign_keys = ON;")  # Explicitly enable foreign keys
+        with self._lock:
+            self._stats["opened"] += 1
+        return conn
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._stats["reconnects"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open(), False
+            if time.monotonic() - last_used < self.health_check_interval or self._is_alive(conn):
+                return conn, True
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the `with` block."""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No database connection became free within {self.timeout} seconds.")
+        wait = time.perf_counter() - start
+        try:
+            conn, hit = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats["borrows"] += 1
+            self._stats["hits"] += hit
+            self._stats["total_wait"] += wait
+            self._stats["max_wait"] = max(self._stats["max_wait"], wait)
+
+        healthy = True
+        try:
+            yield conn
+        except Exception:
+            # Roll back whatever the caller left open, and drop the connection if it is broken
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            healthy = self._is_alive(conn)
+            raise
+        finally:
+            if healthy:
+                self._idle.put((conn, time.monotonic()))
+            else:
+                self._discard(conn)
+            self._slots.release()
+
+    def stats(self):
+        """Returns a snapshot of the pool counters, including hit rate and average wait."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.size
+        stats["idle"] = self._idle.qsize()
+        stats["hit_rate"] = stats["hits"] / stats["borrows"] if stats["borrows"] else 0.0
+        stats["avg_wait"] = stats["total_wait"] / stats["borrows"] if stats["borrows"] else 0.0
+        return stats
+
+
+@st.cache_resource
+def get_connection_pool():
+    """Returns the process-wide connection pool, shared by every session."""
+    return ConnectionPool(get_backend().connect)
+
+
+_CONTEXTLIB_FILE = sys.modules[contextmanager.__module__].__file__
+
+
+def _caller_name():
+    """Returns the name of the first function on the stack outside this module and contextlib."""
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename in (__file__, _CONTEXTLIB_FILE):
+        frame = frame.f_back
+    return frame.f_code.co_name if frame else "?"
+
+
+@contextmanager
+def get_database_connection():
+    """Borrows a connection from the pool; use as `with get_database_connection() as conn:`.
+
+    The time from asking for the connection to handing it back, pool wait included, is recorded
+    against the calling function in the performance stats.
+    """
+    caller = _caller_name()
+    start = time.perf_counter()
+    try:
+        with get_connection_pool().connection() as conn:
+            yield conn
+    finally:
+        record_query(caller, time.perf_counter() - start)
+
+
+@contextmanager
+def transaction():
+    """Borrows a connection and runs the `with` block as a single transaction with one commit."""
+    with get_database_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")  # Take the write lock up front instead of upgrading mid-way
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def run_batch(statements):
+    """Runs (sql, params) pairs as one transaction, in a single round trip where the backend allows."""
+    with get_database_connection() as conn:
+        return get_backend().execute_batch(conn, [("BEGIN IMMEDIATE", ()), *statements, ("COMMIT", ())])
+
+
+def show_pool_stats(container=st.sidebar):
+    """Renders the connection pool counters in an expander."""
+    stats = get_connection_pool().stats()
+    with container.expander("Database Pool"):
+        st.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+        st.metric("Avg Wait (ms)", f"{stats['avg_wait'] * 1000:.1f}")
+        st.caption(f"Max wait {stats['max_wait'] * 1000:.1f} ms · {stats['idle']} idle of {stats['size']} · "
+                   f"{stats['opened']} opened · {stats['reconnects']} reconnects · {stats['timeouts']} timeouts")
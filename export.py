@@ -0,0 +1,118 @@
+"""Full registry export as CSV, XLSX or Parquet.
+
+Rows come from `iter_export_rows` one page of industries at a time and are written out as they
+arrive, so writing an export to disk takes flat memory. The app writes it under static/exports/ and
+links to it, and the browser fetches the file from disk; files over Streamlit's static serving limit
+can only be exported from the command line, `python export.py csv registry.csv`.
+"""
+import csv
+import io
+import secrets
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from repository import EXPORT_COLUMNS, iter_export_rows
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+INTEGER_COLUMNS = {"ind_id", "user_id", "num_stacks", "env_phone", "inst_phone", "cems_phone", "stack_id", "cems_id"}
+REAL_COLUMNS = {
+    "latitude", "longitude", "diameter", "length", "width", "stack_height", "platform_height", "emission_limit",
+    "measuring_range_low", "measuring_range_high",
+}
+
+
+def write_csv(batches, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+    text.flush()
+    text.detach()  # Leave `out` open for the caller
+
+
+def write_xlsx(batches, out):
+    from openpyxl import Workbook
+
+    # Write-only workbooks stream rows to disk instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Registry")
+    sheet.append(EXPORT_COLUMNS)
+    for rows in batches:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(out)
+
+
+def write_parquet(batches, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # A fixed schema, since a page whose column is all NULL would otherwise infer a different type
+    schema = pa.schema([
+        (column, pa.int64() if column in INTEGER_COLUMNS else pa.float64() if column in REAL_COLUMNS else pa.string())
+        for column in EXPORT_COLUMNS
+    ])
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in batches:
+            # Each page becomes its own row group
+            writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, row)) for row in rows], schema=schema))
+
+
+WRITERS = {"CSV": write_csv, "Excel": write_xlsx, "Parquet": write_parquet}
+
+
+def export_registry(fmt, out):
+    """Writes every industry with its stacks and CEMS instruments to the binary file `out`."""
+    WRITERS[fmt](iter_export_rows(), out)
+
+
+EXPORT_DIR = Path(__file__).parent / "static" / "exports"
+# Exports older than this are deleted when the next one is written
+EXPORT_LIFETIME = 3600
+# Streamlit refuses to serve larger static files
+MAX_STATIC_FILE_SIZE = 200 * 1024 * 1024
+
+
+def export_to_static(fmt, file_name):
+    """Writes the export to static/exports/ and returns its URL path.
+
+    The file goes in a directory named by a random token, so only whoever is handed the link can
+    fetch it. Returns None, and deletes the file, when it is too large for Streamlit to serve.
+    """
+    cutoff = time.time() - EXPORT_LIFETIME
+    if EXPORT_DIR.exists():
+        for old in EXPORT_DIR.iterdir():
+            if old.stat().st_mtime < cutoff:
+                shutil.rmtree(old, ignore_errors=True)
+    token = secrets.token_urlsafe(24)
+    path = EXPORT_DIR / token / file_name
+    path.parent.mkdir(parents=True)
+    with open(path, "wb") as out:
+        export_registry(fmt, out)
+    if path.stat().st_size > MAX_STATIC_FILE_SIZE:
+        shutil.rmtree(path.parent)
+        return None
+    return f"app/static/exports/{token}/{file_name}"
+
+
+def main(argv):
+    if len(argv) != 3 or argv[1].lower() not in ("csv", "xlsx", "parquet"):
+        print("usage: python export.py csv|xlsx|parquet OUTPUT_FILE")
+        return 2
+    fmt = {"csv": "CSV", "xlsx": "Excel", "parquet": "Parquet"}[argv[1].lower()]
+    with open(argv[2], "wb") as out:
+        export_registry(fmt, out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,31 @@
+"""The submit step shared by the stack and CEMS grids."""
+import streamlit as st
+
+from journal import FAILED, PENDING, submit_and_wait
+
+
+def submit_grid(check, row_names, kind, user_id, payload, what, saved):
+    """Journals the validated rows of a grid as one `kind` submission and reports the outcome.
+
+    When `check` rejected any row nothing is submitted and each rejected row is listed under its
+    name in `row_names`, a Series on the same index. `what` names the details in messages ("Stack
+    details") and `saved` lists what they were entered for. Reruns the whole app once the rows are
+    saved, so the page moves on to what is still missing.
+    """
+    if not check.valid.all():
+        st.error("Nothing was saved. Please correct these rows:\n\n" + "\n".join(
+            f"- **{row_names[index]}**: {message.rstrip('; ')}"
+            for index, message in check.errors[~check.valid].items()))
+        return
+
+    # The replay worker saves all rows in a single transaction
+    submission = submit_and_wait(kind, user_id, payload)
+    if submission["status"] == FAILED:
+        st.error(f"{what} could not be saved: {submission['last_error']}")
+        return
+    if submission["status"] == PENDING:
+        st.toast(f"{what} for {', '.join(saved)} saved on this server; they will reach the database once it is "
+                 "reachable.")
+    else:
+        st.toast(f"{what} for {', '.join(saved)} saved!")
+    st.rerun()
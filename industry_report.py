@@ -0,0 +1,119 @@
+import html
+
+import streamlit as st
+
+# Shared stylesheet for the stack and parameter tables, emitted once per page
+TABLE_CSS = """
+<style>
+    table {
+        width: 100%;  /* Set the table width */
+        border-collapse: collapse;  /* Optional: for better border handling */
+    }
+    th, td {
+        border: 1px solid #ddd;  /* Optional: add borders to cells */
+        padding: 8px;  /* Optional: add padding to cells */
+        text-align: center;  /* Optional: align text to the left */
+        width: 100px;  /* Default width for all columns */
+    }
+</style>
+"""
+
+# Table heading -> column, in display order
+STACK_TABLE_FIELDS = {
+    "Stack Identity or identification Number": "stack_identity",
+    "Attached Process": "process_attached",
+    "APCD": "apcd_details",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+    "Stack Type": "stack_shape",
+    "Construction Material": "stack_material",
+    "Diameter (m)": "diameter",
+    "Length (m)": "length",
+    "Width (m)": "width",
+    "Stack Height (m)": "stack_height",
+    "Platform located at (m)": "platform_height",
+    "Platform Approachable": "platform_approachable",
+    "Approaching Media": "approaching_media",
+    "CEMS Installed": "cems_installed",
+    "Stack Params": "stack_params",
+    "Duct Params": "duct_params",
+    "Follows Formula": "follows_formula",
+    "Manual Porthole Provided": "manual_port_installed",
+    "CEMS Below Manual": "cems_below_manual",
+    "Parameters": "parameters",
+}
+
+CEMS_TABLE_FIELDS = {
+    "Parameter": "parameter",
+    "Make": "make",
+    "Model": "model",
+    "Serial Number": "serial_number",
+    "SPCB Approved Emission Limit": "emission_limit",
+    "Measuring Range (Low)": "measuring_range_low",
+    "Measuring Range (High)": "measuring_range_high",
+    "Is Certified?": "certified",
+    "Certification Agency": "certification_agency",
+    "Communication Protocol": "communication_protocol",
+    "Measurement Method": "measurement_method",
+    "Technology": "technology",
+    "Connected to BSPCB?": "connected_bspcb",
+    "BSPCB URL": "bspcb_url",
+    "Connected to CPCB?": "connected_cpcb",
+    "CPCB URL": "cpcb_url",
+}
+
+
+def html_table(record, fields):
+    """Builds a one-row HTML table from `record`, leaving out columns that have no value."""
+    cells = [(label, record[column]) for label, column in fields.items() if record[column] is not None]
+    header = "".join(f"<th>{html.escape(label)}</th>" for label, _ in cells)
+    row = "".join(f"<td>{html.escape(str(value))}</td>" for _, value in cells)
+    return f"<table><thead><tr>{header}</tr></thead><tbody><tr>{row}</tr></tbody></table>"
+
+
+def render_industry_report(industry):
+    """Renders an industry from `fetch_industry_report` with its stack and CEMS tables in one pass."""
+    industry_details = {
+        "Industry State OCMMS Code": industry['state_ocmms_id'],
+        "CPCB Industry Code": industry['cpcb_ind_code'],
+        "Industry Category": industry['industry_category'],
+        "Industry Name": industry['industry_name'],
+        "Address": industry['address'],
+        "District": industry['district'],
+        "State": industry['state'],
+        "Production Capacity": industry['production_capacity'],
+        "Number of stacks": industry['num_stacks'],
+        "Environment Department Head": industry['industry_environment_head'],
+        "Environment Head Phone Number": industry['env_phone'],
+        "Instrumentation Department Head": industry['industry_instrument_head'],
+        "Instrumentation Head Phone Number": industry['inst_phone'],
+        "Concerned Person for CEMS": industry['concerned_person_cems'],
+        "Concerned Person for CEMS Phone Number": industry['cems_phone'],
+        "Industry Representative Email Id": industry['industry_representative_email'],
+    }
+    for field, value in industry_details.items():
+        with st.container():
+            cols = st.columns([1, 3])  # Adjust widths as needed
+            cols[0].markdown(f"<p style='font-weight: bold; text-align: left;'>{field}:</p>",
+                             unsafe_allow_html=True)
+            cols[1].markdown(f"<p style='text-align: left;'>{value}</p>", unsafe_allow_html=True)
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    # Display Stack Details with Associated CEMS Parameters Horizontally
+    if not industry["stacks"]:
+        st.warning("No Stack Details Found.")
+        return
+
+    st.markdown("### Stack and CEMS Details")
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+    for i, stack in enumerate(industry["stacks"].values()):
+        st.markdown(f"#### Stack {i + 1} Details")
+        st.markdown(html_table(stack, STACK_TABLE_FIELDS), unsafe_allow_html=True)
+
+        st.markdown("##### Parameter Details")
+        if stack["cems"]:
+            st.markdown("".join(html_table(cems, CEMS_TABLE_FIELDS) for cems in stack["cems"]),
+                        unsafe_allow_html=True)
+        else:
+            st.warning(f"No CEMS Details Found for Stack {stack['stack_id']}.")
@@ -0,0 +1,287 @@
+"""Durable local journal for form submissions, replayed to the primary database in the background.
+
+A submission is first committed to a local SQLite file, which takes milliseconds and survives
+restarts, and a worker thread then applies it to the primary database. Connection errors are
+retried with exponential backoff; constraint violations such as a taken email fail the submission
+for good. Each submission carries a submission_id that the primary records in the same transaction,
+so a retry after a lost reply is never applied twice.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from db import get_backend
+from repository import (DuplicateSubmission, RegistrationConflict, bulk_save_cems, bulk_save_stacks, register_industry,
+                        save_cems, save_stack)
+
+JOURNAL_PATH = os.environ.get("JOURNAL_PATH", "submission_journal.db")
+# Seconds a form waits for its submission to reach the primary before reporting it as queued
+JOURNAL_WAIT = float(os.environ.get("JOURNAL_WAIT", "2"))
+JOURNAL_MAX_ATTEMPTS = int(os.environ.get("JOURNAL_MAX_ATTEMPTS", "50"))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 300.0
+DONE_RETENTION = 7 * 24 * 3600  # Applied submissions are kept this long for the status list
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+SUBMISSION_COLUMNS = [
+    "id", "submission_id", "kind", "user_id", "payload", "status", "attempts", "last_error", "next_attempt_at",
+    "created_at", "updated_at",
+]
+
+
+def _replay_registration(submission):
+    payload = submission["payload"]
+    register_industry(payload["email"], payload["password_hash"], payload["industry"],
+                      submission_id=submission["submission_id"])
+
+
+def _replay_stack(submission):
+    save_stack(submission["user_id"], submission["payload"], submission_id=submission["submission_id"])
+
+
+def _replay_stack_batch(submission):
+    bulk_save_stacks([dict(stack, user_id=submission["user_id"]) for stack in submission["payload"]["stacks"]],
+                     submission_id=submission["submission_id"])
+
+
+def _replay_cems(submission):
+    payload = submission["payload"]
+    save_cems(submission["user_id"], payload["stack_id"], payload, submission_id=submission["submission_id"])
+
+
+def _replay_cems_batch(submission):
+    payload = submission["payload"]
+    bulk_save_cems([dict(cems, stack_id=payload["stack_id"], user_id=submission["user_id"])
+                    for cems in payload["instruments"]], submission_id=submission["submission_id"])
+
+
+# Submission kind -> function applying it to the primary database
+REPLAYERS = {
+    "registration": _replay_registration,
+    "stack": _replay_stack,
+    "stack_batch": _replay_stack_batch,
+    "cems": _replay_cems,
+    "cems_batch": _replay_cems_batch,
+}
+
+
+class SubmissionJournal:
+    """The journal file plus the worker thread that drains it, one per process."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submission_id TEXT UNIQUE,
+                kind TEXT,
+                user_id INTEGER,
+                payload TEXT,
+                status TEXT,
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL,
+                created_at REAL,
+                updated_at REAL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions (status, next_attempt_at)")
+        self._conn.execute("DELETE FROM submissions WHERE status = ? AND updated_at < ?",
+                           (DONE, time.time() - DONE_RETENTION))
+        self._lock = threading.Lock()  # One sqlite3 connection shared by the sessions and the worker
+        self._changed = threading.Condition()  # Notified whenever a submission changes status
+        self._wake = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="journal-replay", daemon=True)
+        self._worker.start()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _rows(self, where, params):
+        rows = self._query(f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM submissions {where}", params)
+        submissions = [dict(zip(SUBMISSION_COLUMNS, row)) for row in rows]
+        for submission in submissions:
+            submission["payload"] = json.loads(submission["payload"])
+        return submissions
+
+    def submit(self, kind, user_id, payload):
+        """Durably records a submission and wakes the worker; returns its submission_id."""
+        submission_id = uuid.uuid4().hex
+        now = time.time()
+        self._query("""
+            INSERT INTO submissions (submission_id, kind, user_id, payload, status, next_attempt_at, created_at,
+                updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (submission_id, kind, user_id, json.dumps(payload), PENDING, now, now, now))
+        self._wake.set()
+        return submission_id
+
+    def get(self, submission_id):
+        rows = self._rows("WHERE submission_id = ?", (submission_id,))
+        return rows[0] if rows else None
+
+    def wait(self, submission_id, timeout=JOURNAL_WAIT):
+        """Waits up to `timeout` seconds for a submission to leave PENDING and returns it."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                submission = self.get(submission_id)
+                remaining = deadline - time.monotonic()
+                if submission["status"] != PENDING or remaining <= 0:
+                    return submission
+                self._changed.wait(remaining)
+
+    def pending(self, user_id, kind):
+        """Returns the payloads of a user's submissions of `kind` not yet applied, oldest first."""
+        return [s["payload"] for s in self._rows("WHERE user_id = ? AND kind = ? AND status = ? ORDER BY id",
+                                                 (user_id, kind, PENDING))]
+
+    def list_for_user(self, user_id):
+        """Returns a user's submissions that are still pending or have failed, newest first."""
+        return self._rows("WHERE user_id = ? AND status != ? ORDER BY id DESC", (user_id, DONE))
+
+    def list_by_ids(self, submission_ids):
+        """Returns the submissions with these submission_ids, newest first."""
+        submission_ids = list(submission_ids)
+        return self._rows(f"WHERE submission_id IN ({', '.join('?' * len(submission_ids))}) ORDER BY id DESC",
+                          submission_ids)
+
+    def list_failed(self, limit=100):
+        """Returns the latest failed submissions of every user, newest first."""
+        return self._rows("WHERE status = ? ORDER BY id DESC LIMIT ?", (FAILED, limit))
+
+    def counts(self):
+        return dict(self._query("SELECT status, COUNT(*) FROM submissions GROUP BY status"))
+
+    def _set_status(self, submission, status, error=None, next_attempt_at=None):
+        self._query("""
+            UPDATE submissions SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = ?,
+                updated_at = ?
+            WHERE id = ?
+        """, (status, error, next_attempt_at, time.time(), submission["id"]))
+        with self._changed:
+            self._changed.notify_all()
+
+    def _replay(self, submission):
+        try:
+            REPLAYERS[submission["kind"]](submission)
+        except DuplicateSubmission:
+            self._set_status(submission, DONE)  # Applied by an earlier attempt whose reply was lost
+        except RegistrationConflict as e:
+            self._set_status(submission, FAILED, str(e))
+        except Exception as e:
+            if get_backend().is_integrity_error(e) or submission["attempts"] + 1 >= JOURNAL_MAX_ATTEMPTS:
+                self._set_status(submission, FAILED, str(e))
+            else:
+                delay = min(RETRY_BASE_DELAY * 2 ** submission["attempts"], RETRY_MAX_DELAY)
+                self._set_status(submission, PENDING, str(e), time.time() + delay)
+                return False
+        else:
+            self._set_status(submission, DONE)
+        return True
+
+    def _run(self):
+        while True:
+            now = time.time()
+            blocked = set()
+            for submission in self._rows("WHERE status = ? ORDER BY id", (PENDING,)):
+                # Keep each user's submissions in order: a stack must exist before its CEMS details. An
+                # earlier one still backing off holds back the later ones, whose own backoff may be shorter
+                if submission["user_id"] in blocked:
+                    continue
+                if submission["next_attempt_at"] > now or not self._replay(submission):
+                    if submission["user_id"] is not None:
+                        blocked.add(submission["user_id"])
+            next_due = self._query("SELECT MIN(next_attempt_at) FROM submissions WHERE status = ?", (PENDING,))[0][0]
+            timeout = None if next_due is None else max(next_due - time.time(), 0.05)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+
+@st.cache_resource
+def get_journal():
+    """Returns the process-wide submission journal, starting its replay worker on first use."""
+    return SubmissionJournal()
+
+
+def submit_and_wait(kind, user_id, payload):
+    """Journals a submission and gives the primary JOURNAL_WAIT seconds to apply it.
+
+    Returns the submission with its status: DONE, FAILED with the reason in "last_error", or still
+    PENDING when the database is slow or unreachable, in which case the worker keeps retrying.
+    """
+    journal = get_journal()
+    return journal.wait(journal.submit(kind, user_id, payload))
+
+
+# Shown in the submission status list
+KIND_LABELS = {"registration": "Registration", "stack": "Stack", "stack_batch": "Stacks", "cems": "CEMS details",
+               "cems_batch": "CEMS details"}
+
+
+def _describe(submission):
+    """Names a submission for the status lists, e.g. "Stacks S1, S2"."""
+    payload = submission["payload"]
+    detail = (payload.get("stack_identity") or payload.get("parameter")
+              or payload.get("industry", {}).get("industry_name")
+              or ", ".join(stack["stack_identity"] for stack in payload.get("stacks", []))
+              or ", ".join(cems["parameter"] for cems in payload.get("instruments", [])))
+    return f"{KIND_LABELS[submission['kind']]} {detail}"
+
+
+def show_submission_status(user_id, container=st.sidebar):
+    """Lists the user's submissions that are still waiting for the database or have failed."""
+    submissions = get_journal().list_for_user(user_id)
+    if not submissions:
+        return
+    with container.expander(f"Unsynced Submissions ({len(submissions)})", expanded=True):
+        for submission in submissions:
+            if submission["status"] == FAILED:
+                st.error(f"{_describe(submission)}: failed. {submission['last_error']}")
+            else:
+                st.info(f"{_describe(submission)}: saved on this server, waiting for the database "
+                        f"({submission['attempts']} attempts).")
+
+
+# Session state key of the submission_ids of registrations still pending when their form returned.
+# Registrations are journaled before there is a user, so the session has to remember them.
+REGISTRATIONS_KEY = "pending_registrations"
+
+
+def show_registration_status(container=st):
+    """Shows what became of the registrations this session left waiting for the database."""
+    submission_ids = st.session_state.get(REGISTRATIONS_KEY)
+    if not submission_ids:
+        return
+    for submission in get_journal().list_by_ids(submission_ids):
+        if submission["status"] == DONE:
+            container.success(f"{_describe(submission)} is complete. You can log in now.")
+        elif submission["status"] == FAILED:
+            container.error(f"{_describe(submission)} failed. {submission['last_error']}")
+        else:
+            container.info(f"{_describe(submission)} is saved on this server and will be completed as soon as the "
+                           f"database is reachable ({submission['attempts']} attempts).")
+
+
+def show_failed_submissions(container=st.sidebar):
+    """Lists the submissions of every user that the database rejected, so admins can follow up."""
+    journal = get_journal()
+    counts = journal.counts()
+    with container.expander(f"Submission Journal ({counts.get(PENDING, 0)} pending, "
+                            f"{counts.get(FAILED, 0)} failed)"):
+        if not counts.get(FAILED):
+            st.caption("No failed submissions.")
+        for submission in journal.list_failed():
+            # Registrations have no user yet; the email is how to reach whoever submitted it
+            who = submission["payload"]["email"] if submission["user_id"] is None else f"user {submission['user_id']}"
+            submitted = time.strftime("%Y-%m-%d %H:%M", time.localtime(submission["created_at"]))
+            st.error(f"{submitted} · {_describe(submission)} by {who}: {submission['last_error']}")
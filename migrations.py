@@ -0,0 +1,413 @@
+import streamlit as st
+
+from db import get_database_connection
+
+# Ordered schema migrations as (version, name, statements). Each one is applied at most once and
+# recorded in schema_version; append new entries, never edit ones that have shipped.
+MIGRATIONS = [
+    (1, "initial tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS user (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE,
+            password TEXT
+        )
+        ''',
+        # Admin table for admin login
+        '''
+        CREATE TABLE IF NOT EXISTS admin (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS industry (
+            ind_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE,
+            user_id_ind TEXT UNIQUE,
+            industry_category TEXT,
+            state_ocmms_id TEXT UNIQUE,
+            cpcb_ind_code TEXT UNIQUE,
+            industry_name TEXT,
+            address TEXT,
+            state TEXT,
+            district TEXT,
+            production_capacity TEXT,
+            num_stacks INTEGER,
+            industry_environment_head TEXT,
+            env_phone INTEGER,
+            industry_instrument_head TEXT,
+            inst_phone INTEGER,
+            concerned_person_cems TEXT,
+            cems_phone INTEGER,
+            industry_representative_email TEXT,
+            completed_stacks INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES user (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS stacks (
+            stack_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            user_id_ind TEXT,
+            stack_identity TEXT,
+            process_attached TEXT,
+            apcd_details TEXT,
+            latitude REAL,
+            longitude REAL,
+            stack_condition TEXT,
+            stack_shape TEXT,
+            diameter REAL,
+            length REAL,
+            width REAL,
+            stack_material TEXT,
+            stack_height REAL,
+            platform_height REAL,
+            platform_approachable TEXT,
+            approaching_media TEXT,
+            cems_installed TEXT,
+            stack_params TEXT,
+            duct_params TEXT,
+            follows_formula TEXT,
+            manual_port_installed TEXT,
+            cems_below_manual TEXT,
+            parameters TEXT,
+            number_params INTEGER DEFAULT 0,
+            completed_parameters INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES industry (ind_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS cems_instruments (
+            cems_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stack_id INTEGER,
+            user_id_ind TEXT,
+            parameter TEXT,
+            make TEXT,
+            model TEXT,
+            serial_number TEXT,
+            emission_limit REAL,
+            measuring_range_low REAL,
+            measuring_range_high REAL,
+            certified TEXT,
+            certification_agency TEXT,
+            communication_protocol TEXT,
+            measurement_method TEXT,
+            technology TEXT,
+            connected_bspcb TEXT,
+            bspcb_url TEXT,
+            cpcb_url TEXT,
+            connected_cpcb TEXT,
+            FOREIGN KEY (stack_id) REFERENCES stacks (stack_id)
+        )
+        ''',
+    ]),
+    (2, "lookup indexes", [
+        # Every industry page looks up stacks by owner; the covering columns serve the CEMS stack list
+        "CREATE INDEX IF NOT EXISTS idx_stacks_user_id ON stacks (user_id, stack_id, process_attached, parameters)",
+        "CREATE INDEX IF NOT EXISTS idx_stacks_user_id_ind ON stacks (user_id_ind)",
+        "CREATE INDEX IF NOT EXISTS idx_cems_user_id_ind ON cems_instruments (user_id_ind)",
+        # Covers both the report join and SELECT DISTINCT parameter ... WHERE stack_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_cems_stack_id ON cems_instruments (stack_id, parameter)",
+        # Admin list filters, ordered like the list itself
+        "CREATE INDEX IF NOT EXISTS idx_industry_district ON industry (district, ind_id)",
+        "CREATE INDEX IF NOT EXISTS idx_industry_category ON industry (industry_category, ind_id)",
+    ]),
+    (3, "compliance summary", [
+        # Per district and category totals for the admin analytics page, kept current by the triggers
+        # below so every writer (forms, bulk import, manual fixes) updates it in the same transaction.
+        # NULL district/category are stored as '' so they still group under the primary key.
+        '''
+        CREATE TABLE IF NOT EXISTS compliance_summary (
+            district TEXT NOT NULL,
+            industry_category TEXT NOT NULL,
+            industries INTEGER NOT NULL DEFAULT 0,
+            declared_stacks INTEGER NOT NULL DEFAULT 0,
+            completed_stacks INTEGER NOT NULL DEFAULT 0,
+            declared_parameters INTEGER NOT NULL DEFAULT 0,
+            completed_parameters INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (district, industry_category)
+        )
+        ''',
+        '''
+        INSERT INTO compliance_summary
+        SELECT IFNULL(i.district, ''), IFNULL(i.industry_category, ''), COUNT(*), IFNULL(SUM(i.num_stacks), 0),
+               IFNULL(SUM(i.completed_stacks), 0), IFNULL(SUM(s.declared), 0), IFNULL(SUM(s.completed), 0)
+        FROM industry i
+        LEFT JOIN (
+            SELECT user_id, SUM(number_params) AS declared, SUM(completed_parameters) AS completed
+            FROM stacks GROUP BY user_id
+        ) s ON s.user_id = i.user_id
+        GROUP BY 1, 2
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_industry_insert AFTER INSERT ON industry
+        BEGIN
+            INSERT INTO compliance_summary (district, industry_category, industries, declared_stacks, completed_stacks)
+            VALUES (IFNULL(NEW.district, ''), IFNULL(NEW.industry_category, ''), 1, IFNULL(NEW.num_stacks, 0),
+                    IFNULL(NEW.completed_stacks, 0))
+            ON CONFLICT (district, industry_category) DO UPDATE SET
+                industries = industries + 1,
+                declared_stacks = declared_stacks + excluded.declared_stacks,
+                completed_stacks = completed_stacks + excluded.completed_stacks;
+        END
+        ''',
+        # Moving an industry to another district or category moves its stacks' parameters along with it
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_industry_update
+        AFTER UPDATE OF district, industry_category, num_stacks, completed_stacks ON industry
+        BEGIN
+            UPDATE compliance_summary SET
+                industries = industries - 1,
+                declared_stacks = declared_stacks - IFNULL(OLD.num_stacks, 0),
+                completed_stacks = completed_stacks - IFNULL(OLD.completed_stacks, 0),
+                declared_parameters = declared_parameters
+                    - (SELECT IFNULL(SUM(number_params), 0) FROM stacks WHERE user_id = OLD.user_id),
+                completed_parameters = completed_parameters
+                    - (SELECT IFNULL(SUM(completed_parameters), 0) FROM stacks WHERE user_id = OLD.user_id)
+            WHERE district = IFNULL(OLD.district, '') AND industry_category = IFNULL(OLD.industry_category, '');
+            INSERT INTO compliance_summary
+            SELECT IFNULL(NEW.district, ''), IFNULL(NEW.industry_category, ''), 1, IFNULL(NEW.num_stacks, 0),
+                   IFNULL(NEW.completed_stacks, 0), IFNULL(SUM(number_params), 0),
+                   IFNULL(SUM(completed_parameters), 0)
+            FROM stacks WHERE user_id = NEW.user_id
+            ON CONFLICT (district, industry_category) DO UPDATE SET
+                industries = industries + 1,
+                declared_stacks = declared_stacks + excluded.declared_stacks,
+                completed_stacks = completed_stacks + excluded.completed_stacks,
+                declared_parameters = declared_parameters + excluded.declared_parameters,
+                completed_parameters = completed_parameters + excluded.completed_parameters;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_industry_delete AFTER DELETE ON industry
+        BEGIN
+            UPDATE compliance_summary SET
+                industries = industries - 1,
+                declared_stacks = declared_stacks - IFNULL(OLD.num_stacks, 0),
+                completed_stacks = completed_stacks - IFNULL(OLD.completed_stacks, 0),
+                declared_parameters = declared_parameters
+                    - (SELECT IFNULL(SUM(number_params), 0) FROM stacks WHERE user_id = OLD.user_id),
+                completed_parameters = completed_parameters
+                    - (SELECT IFNULL(SUM(completed_parameters), 0) FROM stacks WHERE user_id = OLD.user_id)
+            WHERE district = IFNULL(OLD.district, '') AND industry_category = IFNULL(OLD.industry_category, '');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_stack_insert AFTER INSERT ON stacks
+        BEGIN
+            UPDATE compliance_summary SET
+                declared_parameters = declared_parameters + IFNULL(NEW.number_params, 0),
+                completed_parameters = completed_parameters + IFNULL(NEW.completed_parameters, 0)
+            WHERE (district, industry_category) = (
+                SELECT IFNULL(district, ''), IFNULL(industry_category, '') FROM industry WHERE user_id = NEW.user_id
+            );
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_stack_update
+        AFTER UPDATE OF user_id, number_params, completed_parameters ON stacks
+        BEGIN
+            UPDATE compliance_summary SET
+                declared_parameters = declared_parameters - IFNULL(OLD.number_params, 0),
+                completed_parameters = completed_parameters - IFNULL(OLD.completed_parameters, 0)
+            WHERE (district, industry_category) = (
+                SELECT IFNULL(district, ''), IFNULL(industry_category, '') FROM industry WHERE user_id = OLD.user_id
+            );
+            UPDATE compliance_summary SET
+                declared_parameters = declared_parameters + IFNULL(NEW.number_params, 0),
+                completed_parameters = completed_parameters + IFNULL(NEW.completed_parameters, 0)
+            WHERE (district, industry_category) = (
+                SELECT IFNULL(district, ''), IFNULL(industry_category, '') FROM industry WHERE user_id = NEW.user_id
+            );
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS compliance_stack_delete AFTER DELETE ON stacks
+        BEGIN
+            UPDATE compliance_summary SET
+                declared_parameters = declared_parameters - IFNULL(OLD.number_params, 0),
+                completed_parameters = completed_parameters - IFNULL(OLD.completed_parameters, 0)
+            WHERE (district, industry_category) = (
+                SELECT IFNULL(district, ''), IFNULL(industry_category, '') FROM industry WHERE user_id = OLD.user_id
+            );
+        END
+        ''',
+    ]),
+    (4, "stack parameters", [
+        # One row per monitored parameter of a stack, replacing the split of stacks.parameters. The
+        # rowid keeps the order the parameters were chosen in.
+        '''
+        CREATE TABLE IF NOT EXISTS stack_parameters (
+            stack_id INTEGER NOT NULL,
+            parameter TEXT NOT NULL,
+            filled INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (stack_id, parameter),
+            FOREIGN KEY (stack_id) REFERENCES stacks (stack_id)
+        )
+        ''',
+        # "Which stacks monitor SO2" and "which of them are still pending"
+        "CREATE INDEX IF NOT EXISTS idx_stack_parameters_parameter ON stack_parameters (parameter, filled, stack_id)",
+        '''
+        INSERT OR IGNORE INTO stack_parameters (stack_id, parameter)
+        WITH RECURSIVE split (stack_id, position, parameter, rest) AS (
+            SELECT stack_id, 0, '', parameters || ',' FROM stacks WHERE parameters IS NOT NULL
+            UNION ALL
+            SELECT stack_id, position + 1, TRIM(SUBSTR(rest, 1, INSTR(rest, ',') - 1)),
+                   SUBSTR(rest, INSTR(rest, ',') + 1)
+            FROM split WHERE rest <> ''
+        )
+        SELECT stack_id, parameter FROM split WHERE parameter <> '' ORDER BY stack_id, position
+        ''',
+        '''
+        UPDATE stack_parameters SET filled = 1
+        WHERE EXISTS (
+            SELECT 1 FROM cems_instruments c
+            WHERE c.stack_id = stack_parameters.stack_id AND c.parameter = stack_parameters.parameter
+        )
+        ''',
+    ]),
+    (5, "replayed submissions", [
+        # Ids of journaled form submissions already applied, written in the same transaction as the
+        # submission so a replay retried after a lost reply is recognised instead of applied twice
+        '''
+        CREATE TABLE IF NOT EXISTS replayed_submissions (
+            submission_id TEXT PRIMARY KEY,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (6, "industry search index", [
+        # Trigram full-text index over the fields the admin search looks in. It reads the text from
+        # industry itself (external content) and is kept in step by the triggers below, so every
+        # writer updates it in the same transaction. Trigrams match any substring of 3 or more
+        # characters, case-insensitively.
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS industry_search USING fts5(
+            industry_name, address, district, state_ocmms_id, cpcb_ind_code, industry_environment_head,
+            industry_instrument_head, concerned_person_cems,
+            content='industry', content_rowid='ind_id', tokenize='trigram'
+        )
+        ''',
+        "INSERT INTO industry_search (industry_search) VALUES ('rebuild')",
+        # Default ranking: a hit in the name counts most, then the registry ids, then the rest
+        "INSERT INTO industry_search (industry_search, rank) VALUES ('rank', 'bm25(10, 2, 2, 5, 5, 1, 1, 1)')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS search_industry_insert AFTER INSERT ON industry
+        BEGIN
+            INSERT INTO industry_search (rowid, industry_name, address, district, state_ocmms_id, cpcb_ind_code,
+                                         industry_environment_head, industry_instrument_head, concerned_person_cems)
+            VALUES (NEW.ind_id, NEW.industry_name, NEW.address, NEW.district, NEW.state_ocmms_id, NEW.cpcb_ind_code,
+                    NEW.industry_environment_head, NEW.industry_instrument_head, NEW.concerned_person_cems);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS search_industry_update
+        AFTER UPDATE OF ind_id, industry_name, address, district, state_ocmms_id, cpcb_ind_code,
+            industry_environment_head, industry_instrument_head, concerned_person_cems ON industry
+        BEGIN
+            INSERT INTO industry_search (industry_search, rowid, industry_name, address, district, state_ocmms_id,
+                                         cpcb_ind_code, industry_environment_head, industry_instrument_head,
+                                         concerned_person_cems)
+            VALUES ('delete', OLD.ind_id, OLD.industry_name, OLD.address, OLD.district, OLD.state_ocmms_id,
+                    OLD.cpcb_ind_code, OLD.industry_environment_head, OLD.industry_instrument_head,
+                    OLD.concerned_person_cems);
+            INSERT INTO industry_search (rowid, industry_name, address, district, state_ocmms_id, cpcb_ind_code,
+                                         industry_environment_head, industry_instrument_head, concerned_person_cems)
+            VALUES (NEW.ind_id, NEW.industry_name, NEW.address, NEW.district, NEW.state_ocmms_id, NEW.cpcb_ind_code,
+                    NEW.industry_environment_head, NEW.industry_instrument_head, NEW.concerned_person_cems);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS search_industry_delete AFTER DELETE ON industry
+        BEGIN
+            INSERT INTO industry_search (industry_search, rowid, industry_name, address, district, state_ocmms_id,
+                                         cpcb_ind_code, industry_environment_head, industry_instrument_head,
+                                         concerned_person_cems)
+            VALUES ('delete', OLD.ind_id, OLD.industry_name, OLD.address, OLD.district, OLD.state_ocmms_id,
+                    OLD.cpcb_ind_code, OLD.industry_environment_head, OLD.industry_instrument_head,
+                    OLD.concerned_person_cems);
+        END
+        ''',
+    ]),
+    (7, "unswap early CEMS rows", [
+        # The CEMS form used to bind emission_limit and measuring_range_low to each other's columns,
+        # and connected_cpcb and cpcb_url too. Those rows are recognisable: the form only ever stored
+        # Yes or No in connected_cpcb, while they have it in cpcb_url and the URL (or NULL) in
+        # connected_cpcb. A row whose URL was literally "Yes" or "No" cannot be told apart and is
+        # left alone. SET reads the old values, so each pair is swapped back.
+        '''
+        UPDATE cems_instruments SET
+            emission_limit = measuring_range_low,
+            measuring_range_low = emission_limit,
+            connected_cpcb = cpcb_url,
+            cpcb_url = connected_cpcb
+        WHERE cpcb_url IN ('Yes', 'No') AND (connected_cpcb IS NULL OR connected_cpcb NOT IN ('Yes', 'No'))
+        ''',
+    ]),
+    (8, "unique stack identities", [
+        # CEMS details are matched to a stack by its identity, so an industry may not reuse one. Stacks
+        # saved before this check keep the identity on their first use; later ones get their stack_id
+        # appended, e.g. "S1 (42)".
+        '''
+        UPDATE stacks SET stack_identity = stack_identity || ' (' || stack_id || ')'
+        WHERE stack_identity IS NOT NULL
+          AND stack_id NOT IN (SELECT MIN(stack_id) FROM stacks GROUP BY user_id, stack_identity)
+        ''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_stacks_identity ON stacks (user_id, stack_identity)",
+    ]),
+    (9, "industry search terms", [
+        # The trigrams in industry_search, so a search allowing typos only tries spellings that can match
+        "CREATE VIRTUAL TABLE IF NOT EXISTS industry_search_terms USING fts5vocab(industry_search, row)",
+    ]),
+]
+
+
+def current_version(conn):
+    """Returns the highest applied migration version, creating schema_version if needed."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn):
+    """Applies every pending migration in order, each in its own transaction.
+
+    Each step takes the write lock up front and re-reads schema_version under it, so when several
+    processes upgrade the same database at once, each migration is applied by exactly one of them.
+    """
+    applied = []
+    version = current_version(conn)
+    for number, name, statements in MIGRATIONS:
+        if number <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while this one waited for the lock
+            version = current_version(conn)
+            if number <= version:
+                conn.execute("COMMIT")
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (number, name))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append(number)
+    return applied
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_schema():
+    """Brings the database schema up to date once per process instead of on every rerun."""
+    with get_database_connection() as conn:
+        return run_migrations(conn)
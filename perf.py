@@ -0,0 +1,153 @@
+"""Latency instrumentation: database calls and script reruns, aggregated into rolling percentiles.
+
+Every connection borrowed through db.get_database_connection is timed and tagged with the page
+function that was running (see `timed_page`) and the repository function that asked for it. Each rerun
+is timed as a whole and split into DB, pandas and render time, render being whatever is left. The
+last PERF_WINDOW samples of every series are kept, and each sample is also appended to
+PERF_LOG_PATH as a JSON line when it is set.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+PERF_WINDOW = int(os.environ.get("PERF_WINDOW", "1000"))
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH")
+
+# Phase durations of the rerun running on this thread, and the page function inside it
+_current_rerun = contextvars.ContextVar("perf_rerun", default=None)
+_current_page = contextvars.ContextVar("perf_page", default=None)
+
+
+class RollingStats:
+    """The most recent `window` durations of one series, with percentiles computed on demand."""
+
+    def __init__(self, window=PERF_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.count = 0  # All samples ever added, not just the ones in the window
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0}
+
+        def percentile(p):
+            return samples[min(int(p / 100 * len(samples)), len(samples) - 1)]
+
+        return {"count": self.count, "p50": percentile(50), "p95": percentile(95), "p99": percentile(99),
+                "max": samples[-1]}
+
+
+class PerfRecorder:
+    """Thread-safe store of RollingStats per (kind, key), shared by every session."""
+
+    def __init__(self, log_path=PERF_LOG_PATH):
+        self._series = {}
+        self._lock = threading.Lock()
+        self._log = open(log_path, "a", buffering=1) if log_path else None
+
+    def record(self, kind, key, seconds, log=True, **fields):
+        with self._lock:
+            self._series.setdefault((kind, key), RollingStats()).add(seconds)
+            if self._log and log:
+                self._log.write(json.dumps({"ts": time.time(), "kind": kind, "key": list(key),
+                                            "seconds": round(seconds, 6),
+                                            **{name: round(value, 6) for name, value in fields.items()}}) + "\n")
+
+    def summaries(self, kind):
+        """Returns [(key, summary)] for every series of `kind`."""
+        with self._lock:
+            return [(key, stats.summary()) for (series_kind, key), stats in self._series.items()
+                    if series_kind == kind]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+@st.cache_resource
+def get_recorder():
+    """Returns the process-wide recorder."""
+    return PerfRecorder()
+
+
+@contextmanager
+def rerun(name="?"):
+    """Times one script run. Yields a dict whose "name" can be set once the page is known."""
+    timings = {"name": name, "db": 0.0, "pandas": 0.0}
+    token = _current_rerun.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        total = time.perf_counter() - start
+        _current_rerun.reset(token)
+        render = max(total - timings["db"] - timings["pandas"], 0.0)
+        recorder = get_recorder()
+        name = timings["name"]
+        recorder.record("rerun", (name, "total"), total, db=timings["db"], pandas=timings["pandas"], render=render)
+        # The phases are already on the logged "total" line
+        for phase_name, seconds in (("db", timings["db"]), ("pandas", timings["pandas"]), ("render", render)):
+            recorder.record("rerun", (name, phase_name), seconds, log=False)
+
+
+def set_rerun_name(name):
+    """Names the rerun being timed, typically after the page st.navigation picked."""
+    timings = _current_rerun.get()
+    if timings is not None:
+        timings["name"] = name
+
+
+@contextmanager
+def phase(name):
+    """Adds the time spent in the block to phase `name` ("pandas") of the current rerun.
+
+    Database calls made inside the block still count as DB time only.
+    """
+    timings = _current_rerun.get()
+    db_before = timings["db"] if timings is not None else 0.0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] += time.perf_counter() - start - (timings["db"] - db_before)
+
+
+def timed_page(func):
+    """Tags database calls made inside `func` with its name.
+
+    A fragment rerun does not go through main(), so when no rerun is being timed the call is timed
+    as a rerun of its own, named after the function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_page.set(func.__name__)
+        try:
+            if _current_rerun.get() is None:
+                with rerun(f"{func.__name__} (fragment)"):
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            _current_page.reset(token)
+    return wrapper
+
+
+def record_query(caller, seconds):
+    """Records one database call made by the repository function `caller`."""
+    timings = _current_rerun.get()
+    # Calls made by main() around the page, or by a background thread such as the journal worker
+    page_name = _current_page.get() or ("main" if timings is not None else "background")
+    get_recorder().record("query", (page_name, caller), seconds)
+    if timings is not None:
+        timings["db"] += seconds
@@ -0,0 +1,95 @@
+"""Checks that the queries run on every page are served by indexes rather than full table scans.
+
+`python -m pytest tests/test_query_plans.py` checks every hot query. Run `python query_plans.py` to
+migrate a fresh in-memory database and print the plan of each one; it exits non-zero if any of them
+regressed to a scan.
+"""
+import re
+import sqlite3
+import sys
+
+from migrations import run_migrations
+from repository import (EXPORT_QUERY, INDUSTRY_REPORT_QUERY, PENDING_PARAMETERS_QUERY, SEARCH_TERMS_QUERY,
+                        STACK_PROGRESS_QUERY, STACKS_MONITORING_QUERY, USER_STACKS_QUERY, industry_count_query,
+                        industry_list_query)
+
+
+def _industry_list(**filters):
+    sql, params = industry_list_query(**filters)
+    return sql, (*params, 25, 0)
+
+
+def _industry_count(**filters):
+    return industry_count_query(**filters)
+
+
+# name -> (sql, sample parameters)
+HOT_QUERIES = {
+    "industry report by user_id": (INDUSTRY_REPORT_QUERY.format(key="user_id"), (1,)),
+    "industry report by ind_id": (INDUSTRY_REPORT_QUERY.format(key="ind_id"), (1,)),
+    "stack progress": (STACK_PROGRESS_QUERY, (1, 1)),
+    "user stacks": (USER_STACKS_QUERY, (1,)),
+    "pending parameters": (PENDING_PARAMETERS_QUERY, (1,)),
+    "stacks monitoring a parameter": (STACKS_MONITORING_QUERY.format(filled="0, 1"), ("SO2", 1000)),
+    "stacks pending a parameter": (STACKS_MONITORING_QUERY.format(filled="0"), ("SO2", 1000)),
+    "user login": ("SELECT id, password FROM user WHERE email = ?", ("a@b.co",)),
+    "admin login": ("SELECT password FROM admin WHERE username = ?", ("admin",)),
+    "industry list": _industry_list(),
+    "industry list next page": _industry_list(after=100),
+    "industry list by district": _industry_list(district="Patna"),
+    "industry list by category": _industry_list(category="Cement"),
+    "industry list search": _industry_list(search="Ganga Cement"),
+    "industry list fuzzy search": _industry_list(search="Ganaga Cemnet",
+                                                 spellings={"Ganaga": ["ganga", "ganaga"], "Cemnet": ["cement"]}),
+    "search spellings": (SEARCH_TERMS_QUERY.format("?, ?"), ("gan", "ang")),
+    "industry list search by district": _industry_list(search="Ganga", district="Patna"),
+    "industry count": _industry_count(),
+    "industry count by district": _industry_count(district="Patna"),
+    "industry count by category": _industry_count(category="Cement"),
+    "industry search count": _industry_count(search="Ganga", district="Patna"),
+    "registry export page": (EXPORT_QUERY, (0, 200)),
+}
+# Tables whose size does not grow with the registry, so a scan of them is fine: compliance_summary
+# holds one row per district and category in use
+SMALL_TABLES = {"compliance_summary"}
+
+
+def query_plan(conn, sql, params):
+    """Returns the detail lines of EXPLAIN QUERY PLAN for a query."""
+    return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def find_table_scans(conn, queries=HOT_QUERIES):
+    """Returns {query name: plan} for every query in `queries` whose plan contains a full scan."""
+    scans = {}
+    for name, (sql, params) in queries.items():
+        plan = query_plan(conn, sql, params)
+        # "SCAN (subquery-N)" and scans of a co-routine walk an intermediate result, such as a LIMITed
+        # subquery, not a table. A virtual table "scan" with M in its index string is a full-text
+        # MATCH lookup, and one of industry_search_terms with index 1 a lookup by term.
+        coroutines = {step.split()[1] for step in plan if step.startswith("CO-ROUTINE")}
+        if any(step.startswith("SCAN") and not step.startswith("SCAN (")
+               and step.split()[1] not in coroutines | SMALL_TABLES
+               and not re.search(r"VIRTUAL TABLE INDEX \d+:\S*M|industry_search_terms VIRTUAL TABLE INDEX 1:", step)
+               for step in plan):
+            scans[name] = plan
+    return scans
+
+
+def main():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    run_migrations(conn)
+    for name, (sql, params) in HOT_QUERIES.items():
+        print(f"{name}:")
+        for step in query_plan(conn, sql, params):
+            print(f"    {step}")
+    scans = find_table_scans(conn)
+    if scans:
+        print(f"\nFull scans in: {', '.join(scans)}")
+        return 1
+    print("\nAll hot queries use indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
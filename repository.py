@@ -0,0 +1,648 @@
+import json
+import string
+
+from cache import MISSING, get_read_cache, invalidate_industry
+from db import get_backend, get_database_connection, run_batch, transaction
+from utils import split_parameters
+
+# Columns rendered by the industry dashboard and the admin detail view
+INDUSTRY_COLUMNS = [
+    "ind_id", "user_id", "state_ocmms_id", "cpcb_ind_code", "industry_category", "industry_name", "address",
+    "district", "state", "production_capacity", "num_stacks", "industry_environment_head", "env_phone",
+    "industry_instrument_head", "inst_phone", "concerned_person_cems", "cems_phone", "industry_representative_email",
+]
+STACK_COLUMNS = [
+    "stack_id", "stack_identity", "process_attached", "apcd_details", "latitude", "longitude", "stack_shape",
+    "stack_material", "diameter", "length", "width", "stack_height", "platform_height", "platform_approachable",
+    "approaching_media", "cems_installed", "stack_params", "duct_params", "follows_formula",
+    "manual_port_installed", "cems_below_manual", "parameters",
+]
+CEMS_COLUMNS = [
+    "cems_id", "parameter", "make", "model", "serial_number", "emission_limit", "measuring_range_low",
+    "measuring_range_high", "certified", "certification_agency", "communication_protocol", "measurement_method",
+    "technology", "connected_bspcb", "bspcb_url", "connected_cpcb", "cpcb_url",
+]
+
+INDUSTRY_REPORT_QUERY = f"""
+    SELECT {", ".join("i." + col for col in INDUSTRY_COLUMNS)},
+           {", ".join("s." + col for col in STACK_COLUMNS)},
+           {", ".join("c." + col for col in CEMS_COLUMNS)}
+    FROM industry i
+    LEFT JOIN stacks s ON s.user_id_ind = i.user_id_ind
+    LEFT JOIN cems_instruments c ON c.stack_id = s.stack_id
+    WHERE i.{{key}} = ?
+    ORDER BY s.stack_id, c.cems_id
+"""
+
+STACK_PROGRESS_QUERY = """
+    SELECT num_stacks, (SELECT COUNT(*) FROM stacks WHERE user_id = ?), state_ocmms_id
+    FROM industry WHERE user_id = ?
+"""
+
+USER_STACKS_QUERY = "SELECT stack_id, process_attached, parameters FROM stacks WHERE user_id = ?"
+
+PENDING_PARAMETERS_QUERY = "SELECT parameter FROM stack_parameters WHERE stack_id = ? AND filled = 0 ORDER BY rowid"
+
+STACKS_MONITORING_QUERY = """
+    SELECT i.ind_id, i.industry_name, i.district, s.stack_id, s.stack_identity, s.process_attached, sp.filled
+    FROM stack_parameters sp
+    JOIN stacks s ON s.stack_id = sp.stack_id
+    JOIN industry i ON i.user_id = s.user_id
+    WHERE sp.parameter = ? AND sp.filled IN ({filled})
+    ORDER BY sp.filled, sp.stack_id
+    LIMIT ?
+"""
+
+
+def fetch_industry_report(ind_id=None, user_id=None):
+    """Fetches one industry with its stacks and CEMS instruments in a single round trip.
+
+    Look up by `ind_id` (admin view) or by the owning `user_id` (industry dashboard). Returns None
+    when the industry does not exist, otherwise a dict of the industry columns plus a "stacks" dict
+    keyed by stack_id, in insertion order, where each stack carries its own "cems" list. Reports are
+    served from the read cache and shared between sessions, so callers must not modify them.
+    """
+    key, value = ("ind_id", ind_id) if ind_id is not None else ("user_id", user_id)
+    cached = get_read_cache().get(("industry_report", key, value))
+    if cached is not MISSING:
+        return cached
+    # The owner of an ind_id lookup is only known from the result
+    generation = get_read_cache().generation(user_id)
+    with get_database_connection() as conn:
+        rows = conn.execute(INDUSTRY_REPORT_QUERY.format(key=key), (value,)).fetchall()
+    if not rows:
+        return None
+
+    n_ind, n_stack = len(INDUSTRY_COLUMNS), len(STACK_COLUMNS)
+    industry = dict(zip(INDUSTRY_COLUMNS, rows[0][:n_ind]))
+    industry["stacks"] = {}
+    for row in rows:
+        stack_values = row[n_ind:n_ind + n_stack]
+        if stack_values[0] is None:  # industry without stacks
+            continue
+        stack = industry["stacks"].get(stack_values[0])
+        if stack is None:
+            stack = industry["stacks"][stack_values[0]] = dict(zip(STACK_COLUMNS, stack_values))
+            stack["cems"] = []
+        cems_values = row[n_ind + n_stack:]
+        if cems_values[0] is not None:
+            stack["cems"].append(dict(zip(CEMS_COLUMNS, cems_values)))
+    # Tagged with the owner so writes by that industry invalidate admin (ind_id) lookups too
+    get_read_cache().put(("industry_report", key, value), industry, owner=industry["user_id"], generation=generation)
+    return industry
+
+
+# Columns of the full registry export: one row per CEMS instrument, or per stack or industry when
+# nothing hangs off it
+EXPORT_COLUMNS = INDUSTRY_COLUMNS + STACK_COLUMNS + CEMS_COLUMNS
+EXPORT_BATCH_SIZE = 200  # industries per export query
+
+EXPORT_QUERY = f"""
+    SELECT {", ".join("i." + col for col in INDUSTRY_COLUMNS)},
+           {", ".join("s." + col for col in STACK_COLUMNS)},
+           {", ".join("c." + col for col in CEMS_COLUMNS)}
+    FROM (SELECT * FROM industry WHERE ind_id > ? ORDER BY ind_id LIMIT ?) i
+    LEFT JOIN stacks s ON s.user_id_ind = i.user_id_ind
+    LEFT JOIN cems_instruments c ON c.stack_id = s.stack_id
+    ORDER BY i.ind_id, s.stack_id, c.cems_id
+"""
+
+
+def iter_export_rows(batch_size=EXPORT_BATCH_SIZE):
+    """Yields lists of EXPORT_COLUMNS rows covering every industry, `batch_size` industries at a time.
+
+    Pages are keyed on ind_id rather than OFFSET, so each query is an index range scan and only one
+    page is held in memory. The connection goes back to the pool between pages, so a slow consumer
+    does not pin it. Bypasses the read cache.
+    """
+    last_ind_id = 0
+    while True:
+        with get_database_connection() as conn:
+            rows = conn.execute(EXPORT_QUERY, (last_ind_id, batch_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_ind_id = rows[-1][0]
+
+
+def get_stack_progress(user_id):
+    """Returns (declared number of stacks, number of stacks filled, State OCMMS ID) for an industry."""
+    key = ("stack_progress", user_id)
+    cached = get_read_cache().get(key)
+    if cached is not MISSING:
+        return cached
+    generation = get_read_cache().generation(user_id)
+    with get_database_connection() as conn:
+        row = conn.execute(STACK_PROGRESS_QUERY, (user_id, user_id)).fetchone()
+    if row is None:
+        return None
+    progress = (row[0], row[1], row[2])
+    get_read_cache().put(key, progress, owner=user_id, generation=generation)
+    return progress
+
+
+def list_user_stacks(user_id):
+    """Returns (stack_id, process_attached, parameters) for each stack of an industry."""
+    key = ("user_stacks", user_id)
+    cached = get_read_cache().get(key)
+    if cached is not MISSING:
+        return cached
+    generation = get_read_cache().generation(user_id)
+    with get_database_connection() as conn:
+        stacks = [tuple(row) for row in conn.execute(USER_STACKS_QUERY, (user_id,)).fetchall()]
+    get_read_cache().put(key, stacks, owner=user_id, generation=generation)
+    return stacks
+
+
+def list_pending_parameters(user_id, stack_id):
+    """Returns the parameters of one of the industry's stacks that still need CEMS details, in order."""
+    key = ("pending_parameters", user_id, stack_id)
+    cached = get_read_cache().get(key)
+    if cached is not MISSING:
+        return cached
+    generation = get_read_cache().generation(user_id)
+    with get_database_connection() as conn:
+        parameters = [row[0] for row in conn.execute(PENDING_PARAMETERS_QUERY, (stack_id,)).fetchall()]
+    get_read_cache().put(key, parameters, owner=user_id, generation=generation)
+    return parameters
+
+
+# Columns returned by list_stacks_monitoring
+STACKS_MONITORING_COLUMNS = [
+    "ind_id", "industry_name", "district", "stack_id", "stack_identity", "process_attached", "filled",
+]
+
+
+def list_stacks_monitoring(parameter, pending_only=False, limit=1000):
+    """Returns the stacks that monitor `parameter`, pending ones first, with their industry.
+
+    Served by idx_stack_parameters_parameter instead of a LIKE over stacks.parameters.
+    """
+    query = STACKS_MONITORING_QUERY.format(filled="0" if pending_only else "0, 1")
+    with get_database_connection() as conn:
+        rows = conn.execute(query, (parameter, limit)).fetchall()
+    return [dict(zip(STACKS_MONITORING_COLUMNS, row)) for row in rows]
+
+
+# Columns shown in the admin industry list
+INDUSTRY_LIST_COLUMNS = [
+    "ind_id", "industry_name", "industry_category", "state_ocmms_id", "cpcb_ind_code", "district",
+    "production_capacity", "num_stacks",
+]
+
+
+# Shortest word the trigram index can look up; shorter ones are matched with LIKE on the name
+MIN_SEARCH_WORD = 3
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+# Shortest word looked up with a typo, and shortest spelling of it tried. Words match as substrings,
+# so a shorter spelling would match much of the registry, e.g. "one" for "Sone"
+MIN_FUZZY_WORD = 4
+# Characters tried when a typo replaced or dropped one
+SPELLING_ALPHABET = string.ascii_lowercase + string.digits
+
+SEARCH_TERMS_QUERY = "SELECT term FROM industry_search_terms WHERE term IN ({})"
+
+
+def _one_edit_away(word):
+    """Returns the spellings of `word`, lowercased, that are at most one edit away: a character
+    deleted, replaced or inserted, or two neighbours swapped. Spellings shorter than MIN_FUZZY_WORD
+    are left out, and so are edits at either end that another spelling already covers as a
+    substring: a replaced end character by the spelling without it, an added one by the word itself.
+    """
+    word = word.lower()
+    spellings = {word}
+    spellings.update(word[:i] + word[i + 1:] for i in range(len(word)))
+    spellings.update(word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1))
+    replaced = range(len(word)) if len(word) <= MIN_FUZZY_WORD else range(1, len(word) - 1)
+    spellings.update(word[:i] + c + word[i + 1:] for i in replaced for c in SPELLING_ALPHABET)
+    spellings.update(word[:i] + c + word[i:] for i in range(1, len(word)) for c in SPELLING_ALPHABET)
+    return sorted(spelling for spelling in spellings if len(spelling) >= MIN_FUZZY_WORD)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def find_spellings(conn, search):
+    """Returns {word: spellings} for the words of `search` long enough to allow a typo.
+
+    Of the spellings one edit away, only those whose every trigram occurs in industry_search are
+    kept; the others cannot match, and would cost the search a phrase each.
+    """
+    candidates = {word: _one_edit_away(word) for word in search.split() if len(word) >= MIN_FUZZY_WORD}
+    trigrams = sorted(set().union(*(_trigrams(spelling) for spellings in candidates.values()
+                                    for spelling in spellings)))
+    if not trigrams:
+        return {}
+    known = {row[0] for row in conn.execute(SEARCH_TERMS_QUERY.format(_placeholders(len(trigrams))), trigrams)}
+    return {word: [spelling for spelling in spellings if _trigrams(spelling) <= known]
+            for word, spellings in candidates.items()}
+
+
+def search_match(search, spellings=None):
+    """Returns the industry_search MATCH expression for the words of `search`, or None if none is long
+    enough for the index.
+
+    Every word must appear in one of the indexed fields, or, for the words in `spellings` (see
+    find_spellings), one of their spellings.
+    """
+    clauses = []
+    for word in search.split():
+        if len(word) < MIN_SEARCH_WORD:
+            continue
+        alternatives = (spellings or {}).get(word) or [word]
+        clauses.append("(" + " OR ".join(map(_phrase, alternatives)) + ")")  # AND binds tighter than OR
+    return " AND ".join(clauses) or None
+
+
+def _industry_filter(search, district, category, spellings):
+    """Returns (tables, conditions, params, searched) selecting the industries that match a search and
+    filters."""
+    tables, where, params = "industry", [], []
+    match = search_match(search, spellings)
+    if match:
+        # Each word with spellings that an industry only matches misspelt counts as one typo. CROSS JOIN
+        # keeps the index hits as the outer loop; driven from a district or category index instead,
+        # SQLite would evaluate the MATCH once per industry in that district or category
+        typo = "(rowid NOT IN (SELECT rowid FROM industry_search WHERE industry_search MATCH ?))"
+        tables = f"""
+            (SELECT rowid AS hit_id, {" + ".join([typo] * len(spellings or ())) or "0"} AS typos, rank
+             FROM industry_search WHERE industry_search MATCH ?) hits
+            CROSS JOIN industry ON industry.ind_id = hits.hit_id
+        """
+        params += [_phrase(word) for word in spellings or ()] + [match]
+    for word in search.split():
+        if len(word) < MIN_SEARCH_WORD:
+            where.append("industry_name LIKE ? ESCAPE '\\'")  # LIKE is case-insensitive for ASCII
+            params.append(f"%{_escape_like(word)}%")
+    if district:
+        where.append("district = ?")
+        params.append(district)
+    if category:
+        where.append("industry_category = ?")
+        params.append(category)
+    return tables, where, params, bool(search.split())
+
+
+def industry_list_query(search="", district=None, category=None, spellings=None, after=None):
+    """Builds the query of one page of the admin list; returns (sql, params) without the LIMIT and
+    OFFSET values.
+
+    Searched lists are ordered by typos, then relevance (industry_search's bm25 rank), and paged with
+    OFFSET, as every match has to be ranked anyway. The rest are ordered by ind_id and paged by keyset: `after`
+    is the last ind_id of the previous page, so a page walks the primary key or the district or
+    category index from there and stops after LIMIT rows.
+    """
+    tables, where, params, searched = _industry_filter(search, district, category, spellings)
+    if not searched:
+        where.append("ind_id > ?")
+        params.append(after or 0)
+    query = f"""
+        SELECT {", ".join(INDUSTRY_LIST_COLUMNS)}
+        FROM {tables}
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY {"hits.typos, hits.rank, " if tables != "industry" else ""}ind_id
+        LIMIT ? OFFSET ?
+    """
+    return query, params
+
+
+def industry_count_query(search="", district=None, category=None, spellings=None):
+    """Builds the query counting the industries of the admin list; returns (sql, params).
+
+    Without a search the count comes from the compliance_summary totals, a few hundred rows however
+    many industries are registered.
+    """
+    tables, where, params, searched = _industry_filter(search, district, category, spellings)
+    if searched:
+        return f"SELECT COUNT(*) FROM {tables} {'WHERE ' + ' AND '.join(where) if where else ''}", params
+    return f"""
+        SELECT IFNULL(SUM(industries), 0) FROM compliance_summary
+        {"WHERE " + " AND ".join(where) if where else ""}
+    """, params
+
+
+def list_industries(search="", district=None, category=None, limit=25, offset=0, after=None, fuzzy=False):
+    """Returns one page of the admin industry list and the total number of matching industries.
+
+    Search and filters run in SQL, so only `limit` rows cross the network. Searched pages are picked
+    with `offset`, the others with `after` (see industry_list_query). `fuzzy` lets search words of
+    MIN_FUZZY_WORD or more characters match with one typo (see find_spellings); industries that need
+    fewer typos come first.
+    """
+    if not search.split():
+        offset = 0  # Keyset paging: `after` already skips the earlier pages
+    with get_database_connection() as conn:
+        spellings = find_spellings(conn, search) if fuzzy else None
+        query, params = industry_list_query(search, district, category, spellings, after)
+        count_query, count_params = industry_count_query(search, district, category, spellings)
+        rows = conn.execute(query, (*params, limit, offset)).fetchall()
+        total = conn.execute(count_query, count_params).fetchone()[0]
+    return [dict(zip(INDUSTRY_LIST_COLUMNS, row)) for row in rows], total
+
+
+COMPLIANCE_SUMMARY_COLUMNS = [
+    "district", "industry_category", "industries", "declared_stacks", "completed_stacks", "declared_parameters",
+    "completed_parameters",
+]
+
+
+def get_compliance_summary():
+    """Returns the per district and category totals maintained by the compliance_summary triggers.
+
+    The table holds one row per district and category in use, so this costs the same however many
+    industries are registered.
+    """
+    with get_database_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT {", ".join(COMPLIANCE_SUMMARY_COLUMNS)} FROM compliance_summary WHERE industries > 0
+        """).fetchall()
+    return [dict(zip(COMPLIANCE_SUMMARY_COLUMNS, row)) for row in rows]
+
+
+def get_admin_password(username):
+    """Returns the stored password hash of an admin, or None."""
+    with get_database_connection() as conn:
+        row = conn.execute("SELECT password FROM admin WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+
+def get_user_credentials(email):
+    """Returns (user id, password hash) of an industry user, or None."""
+    with get_database_connection() as conn:
+        row = conn.execute("SELECT id, password FROM user WHERE email = ?", (email,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+class RegistrationConflict(Exception):
+    """Raised when the email, State OCMMS ID or CPCB code of a new registration is already taken."""
+
+
+class DuplicateSubmission(Exception):
+    """Raised when a journaled submission with the same submission_id has already been applied."""
+
+
+RECORD_SUBMISSION = "INSERT INTO replayed_submissions (submission_id) VALUES (?)"
+
+
+def _run_saves(statements, submission_id=None):
+    """Runs the statements of a save as one transaction in a single round trip.
+
+    A `submission_id` is recorded in the same transaction, so the writes apply at most once;
+    DuplicateSubmission is raised if it was applied before.
+    """
+    statements = [(RECORD_SUBMISSION, (submission_id,))] + statements if submission_id else statements
+    try:
+        run_batch(statements)
+    except Exception as e:
+        if get_backend().is_integrity_error(e) and "replayed_submissions" in str(e):
+            raise DuplicateSubmission(submission_id) from e
+        raise
+
+
+# Column named in the UNIQUE constraint error -> message shown on the registration form
+UNIQUE_FIELD_ERRORS = {
+    "user.email": "Email already exists.",
+    "industry.state_ocmms_id": "State OCMMS ID already exists.",
+    "industry.cpcb_ind_code": "CPCB Industry code already exists.",
+}
+
+
+# Industry columns filled in by the registration form, in INSERT order
+REGISTRATION_COLUMNS = [
+    "industry_category", "state_ocmms_id", "cpcb_ind_code", "industry_name", "address", "state", "district",
+    "production_capacity", "num_stacks", "industry_environment_head", "env_phone", "industry_instrument_head",
+    "inst_phone", "concerned_person_cems", "cems_phone",
+]
+
+
+def register_industry(email, password_hash, industry, submission_id=None):
+    """Creates the login user and its industry from a dict of REGISTRATION_COLUMNS atomically.
+
+    Both INSERTs go out as one transaction, and the UNIQUE constraints do the duplicate checks, so
+    a registration costs a single round trip. Raises RegistrationConflict naming the taken field, or
+    DuplicateSubmission if `submission_id` was applied before.
+    """
+    statements = [(RECORD_SUBMISSION, (submission_id,))] if submission_id else []
+    try:
+        run_batch(statements + [
+            # Insert user (with email used for login)
+            ("INSERT INTO user (email, password) VALUES (?, ?)", (email, password_hash)),
+            # last_insert_rowid() is still the new user's id while this row is being inserted
+            (f"""
+                INSERT INTO industry (user_id, user_id_ind, {", ".join(REGISTRATION_COLUMNS)},
+                    industry_representative_email)
+                VALUES (last_insert_rowid(), 'ind_' || last_insert_rowid(),
+                    {", ".join("?" * (len(REGISTRATION_COLUMNS) + 1))})
+            """, (*(industry[col] for col in REGISTRATION_COLUMNS), email)),
+        ])
+    except Exception as e:
+        if not get_backend().is_integrity_error(e):
+            raise
+        message = str(e)
+        if "replayed_submissions" in message:
+            raise DuplicateSubmission(submission_id) from e
+        for field, error in UNIQUE_FIELD_ERRORS.items():
+            if field in message:
+                raise RegistrationConflict(error) from e
+        raise RegistrationConflict("This industry is already registered.") from e
+    # A new user has nothing in the read cache, so there is nothing to invalidate
+
+
+# Stack columns filled in by the stack form, in INSERT order
+STACK_FORM_COLUMNS = [
+    "stack_identity", "process_attached", "apcd_details", "latitude", "longitude", "stack_condition", "stack_shape",
+    "diameter", "length", "width", "stack_material", "stack_height", "platform_height", "platform_approachable",
+    "approaching_media", "cems_installed", "stack_params", "duct_params", "follows_formula", "manual_port_installed",
+    "cems_below_manual", "parameters",
+]
+
+
+# Inserts the stack_parameters of the stack inserted just before, from a JSON list of parameters.
+# The MATERIALIZED CTE reads last_insert_rowid() once, before the first parameter row replaces it.
+INSERT_NEW_STACK_PARAMETERS = """
+    WITH new AS MATERIALIZED (SELECT last_insert_rowid() AS stack_id)
+    INSERT INTO stack_parameters (stack_id, parameter)
+    SELECT new.stack_id, p.value FROM new, json_each(?) p ORDER BY p.key
+"""
+
+
+def _stack_statements(user_id, stack):
+    """Returns the statements inserting one stack and its stack_parameters rows."""
+    parameters = split_parameters(stack["parameters"])
+    return [
+        (f"""
+            INSERT INTO stacks (user_id, user_id_ind, {", ".join(STACK_FORM_COLUMNS)}, number_params)
+            VALUES ({_placeholders(len(STACK_FORM_COLUMNS) + 3)})
+        """, (user_id, f"ind_{user_id}", *(stack[col] for col in STACK_FORM_COLUMNS), len(parameters))),
+        (INSERT_NEW_STACK_PARAMETERS, (json.dumps(parameters),)),
+    ]
+
+
+def save_stack(user_id, stack, submission_id=None):
+    """Stores one stack from a dict of STACK_FORM_COLUMNS and bumps the industry's completed_stacks.
+
+    The stack, its stack_parameters rows and the counter are written in one transaction and a single
+    round trip, so they never disagree. `submission_id` works as in _run_saves.
+    """
+    try:
+        _run_saves(_stack_statements(user_id, stack) + [
+            # Increment the completed_stacks counter
+            ("UPDATE industry SET completed_stacks = completed_stacks + 1 WHERE user_id = ?", (user_id,)),
+        ], submission_id)
+    finally:
+        invalidate_industry(user_id)
+
+
+# CEMS instrument columns filled in by the CEMS form, in INSERT order
+CEMS_FORM_COLUMNS = [
+    "parameter", "make", "model", "serial_number", "emission_limit", "measuring_range_low", "measuring_range_high",
+    "certified", "certification_agency", "communication_protocol", "measurement_method", "technology",
+    "connected_bspcb", "bspcb_url", "connected_cpcb", "cpcb_url",
+]
+
+
+def _cems_statement(stack_id, user_id, cems):
+    """Returns the statement inserting one CEMS instrument."""
+    return (f"""
+        INSERT INTO cems_instruments (stack_id, user_id_ind, {", ".join(CEMS_FORM_COLUMNS)})
+        VALUES ({_placeholders(len(CEMS_FORM_COLUMNS) + 2)})
+    """, (stack_id, f"ind_{user_id}", *(cems[col] for col in CEMS_FORM_COLUMNS)))
+
+
+MARK_FILLED = "UPDATE stack_parameters SET filled = 1 WHERE stack_id = ? AND parameter = ?"
+
+
+def save_cems(user_id, stack_id, cems, submission_id=None):
+    """Stores the CEMS instrument of one parameter, bumps the stack's completed_parameters and marks the
+    parameter filled, atomically in a single round trip. `submission_id` works as in _run_saves."""
+    try:
+        _run_saves([
+            _cems_statement(stack_id, user_id, cems),
+            ("UPDATE stacks SET completed_parameters = completed_parameters + 1 WHERE stack_id = ?", (stack_id,)),
+            (MARK_FILLED, (stack_id, cems["parameter"])),
+        ], submission_id)
+    finally:
+        invalidate_industry(user_id)
+
+
+def _placeholders(count):
+    return ", ".join("?" * count)
+
+
+def find_registration_conflicts(emails, state_ocmms_ids, cpcb_ind_codes):
+    """Returns {field: values already registered} for candidate registrations, in one query."""
+    emails, state_ocmms_ids, cpcb_ind_codes = list(emails), list(state_ocmms_ids), list(cpcb_ind_codes)
+    with get_database_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT 'email', email FROM user WHERE email IN ({_placeholders(len(emails))})
+            UNION ALL
+            SELECT 'state_ocmms_id', state_ocmms_id FROM industry
+            WHERE state_ocmms_id IN ({_placeholders(len(state_ocmms_ids))})
+            UNION ALL
+            SELECT 'cpcb_ind_code', cpcb_ind_code FROM industry
+            WHERE cpcb_ind_code IN ({_placeholders(len(cpcb_ind_codes))})
+        """, (*emails, *state_ocmms_ids, *cpcb_ind_codes)).fetchall()
+    conflicts = {"email": set(), "state_ocmms_id": set(), "cpcb_ind_code": set()}
+    for field, value in rows:
+        conflicts[field].add(value)
+    return conflicts
+
+
+def bulk_register_industries(registrations):
+    """Registers many industries in one transaction with batched INSERTs.
+
+    Each registration is a dict of "email", "password_hash" and REGISTRATION_COLUMNS.
+    """
+    with transaction() as conn:
+        conn.executemany("INSERT INTO user (email, password) VALUES (?, ?)",
+                         [(r["email"], r["password_hash"]) for r in registrations])
+        conn.executemany(f"""
+            INSERT INTO industry (user_id, user_id_ind, {", ".join(REGISTRATION_COLUMNS)},
+                industry_representative_email)
+            SELECT id, 'ind_' || id, {_placeholders(len(REGISTRATION_COLUMNS))}, email FROM user WHERE email = ?
+        """, [(*(r[col] for col in REGISTRATION_COLUMNS), r["email"]) for r in registrations])
+
+
+def find_industries_by_ocmms_id(state_ocmms_ids):
+    """Returns {state_ocmms_id: (user_id, declared number of stacks, stacks filled)}."""
+    state_ocmms_ids = list(state_ocmms_ids)
+    with get_database_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT state_ocmms_id, user_id, num_stacks, (SELECT COUNT(*) FROM stacks s WHERE s.user_id = i.user_id)
+            FROM industry i WHERE state_ocmms_id IN ({_placeholders(len(state_ocmms_ids))})
+        """, state_ocmms_ids).fetchall()
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+
+def bulk_save_stacks(stacks, submission_id=None):
+    """Stores many stacks and bumps each industry's completed_stacks, all in one transaction and a
+    single round trip.
+
+    Each stack is a dict of "user_id" and STACK_FORM_COLUMNS. `submission_id` works as in _run_saves.
+    """
+    added = {}
+    for stack in stacks:
+        added[stack["user_id"]] = added.get(stack["user_id"], 0) + 1
+    try:
+        _run_saves([statement for stack in stacks for statement in _stack_statements(stack["user_id"], stack)] + [
+            ("UPDATE industry SET completed_stacks = completed_stacks + ? WHERE user_id = ?", (count, user_id))
+            for user_id, count in added.items()
+        ], submission_id)
+    finally:
+        for user_id in added:
+            invalidate_industry(user_id)
+
+
+def find_stacks_by_identity(state_ocmms_ids):
+    """Returns {(state_ocmms_id, stack_identity): [(stack_id, user_id, {parameter: filled})]}.
+
+    More than one entry under a key means the industry reused a stack identity.
+    """
+    state_ocmms_ids = list(state_ocmms_ids)
+    with get_database_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT i.state_ocmms_id, s.stack_identity, s.stack_id, s.user_id, sp.parameter, sp.filled
+            FROM industry i
+            JOIN stacks s ON s.user_id_ind = i.user_id_ind
+            LEFT JOIN stack_parameters sp ON sp.stack_id = s.stack_id
+            WHERE i.state_ocmms_id IN ({_placeholders(len(state_ocmms_ids))})
+            ORDER BY s.stack_id
+        """, state_ocmms_ids).fetchall()
+    stacks, parameters = {}, {}
+    for state_ocmms_id, stack_identity, stack_id, user_id, parameter, filled in rows:
+        if stack_id not in parameters:
+            parameters[stack_id] = {}
+            stacks.setdefault((state_ocmms_id, stack_identity), []).append((stack_id, user_id, parameters[stack_id]))
+        if parameter is not None:
+            parameters[stack_id][parameter] = bool(filled)
+    return stacks
+
+
+def bulk_save_cems(instruments, submission_id=None):
+    """Stores many CEMS instruments, bumps completed_parameters and marks the parameters filled in one
+    transaction and a single round trip.
+
+    Each instrument is a dict of "stack_id", "user_id" and CEMS_FORM_COLUMNS. `submission_id` works
+    as in _run_saves.
+    """
+    added = {}
+    for cems in instruments:
+        added[cems["stack_id"]] = added.get(cems["stack_id"], 0) + 1
+    try:
+        _run_saves([_cems_statement(c["stack_id"], c["user_id"], c) for c in instruments] + [
+            ("UPDATE stacks SET completed_parameters = completed_parameters + ? WHERE stack_id = ?", (count, stack_id))
+            for stack_id, count in added.items()
+        ] + [(MARK_FILLED, (c["stack_id"], c["parameter"])) for c in instruments], submission_id)
+    finally:
+        for user_id in {cems["user_id"] for cems in instruments}:
+            invalidate_industry(user_id)
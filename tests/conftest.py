@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app modules read their storage settings at import time, so point them at throwaway
+# in-memory databases before any test imports them
+os.environ.update(STORAGE_BACKEND="sqlite", SQLITE_PATH=":memory:", JOURNAL_PATH=":memory:")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,80 @@
+import pytest
+
+from db import get_database_connection
+from migrations import ensure_schema
+from repository import (CEMS_FORM_COLUMNS, REGISTRATION_COLUMNS, STACK_FORM_COLUMNS, bulk_register_industries,
+                        bulk_save_cems, bulk_save_stacks, find_industries_by_ocmms_id, register_industry,
+                        save_cems, save_stack)
+
+# compliance_summary recomputed from scratch, as migration 3 first filled it
+RECOMPUTED_SUMMARY = """
+    SELECT IFNULL(i.district, ''), IFNULL(i.industry_category, ''), COUNT(*), IFNULL(SUM(i.num_stacks), 0),
+           IFNULL(SUM(i.completed_stacks), 0), IFNULL(SUM(s.declared), 0), IFNULL(SUM(s.completed), 0)
+    FROM industry i
+    LEFT JOIN (
+        SELECT user_id, SUM(number_params) AS declared, SUM(completed_parameters) AS completed
+        FROM stacks GROUP BY user_id
+    ) s ON s.user_id = i.user_id
+    GROUP BY 1, 2
+"""
+
+
+def _registration(number, district, industry_category):
+    registration = {column: None for column in REGISTRATION_COLUMNS}
+    registration.update(email=f"summary{number}@example.com", password_hash="x", state_ocmms_id=f"SUMMARY{number}",
+                        district=district, industry_category=industry_category, num_stacks=3)
+    return registration
+
+
+def _stack(identity, parameters):
+    return {column: None for column in STACK_FORM_COLUMNS} | {"stack_identity": identity, "parameters": parameters}
+
+
+def _cems(parameter):
+    return {column: None for column in CEMS_FORM_COLUMNS} | {"parameter": parameter}
+
+
+def _summary(conn):
+    return sorted(conn.execute("""
+        SELECT * FROM compliance_summary
+        WHERE industries OR declared_stacks OR completed_stacks OR declared_parameters OR completed_parameters
+    """).fetchall())
+
+
+@pytest.fixture(scope="module")
+def user_ids():
+    ensure_schema()
+    bulk_register_industries([_registration(number, ["Patna", "Gaya", "Buxar"][number % 3],
+                                            ["Cement", "Sugar"][number % 2]) for number in range(30)])
+    registration = _registration(30, None, None)
+    register_industry(registration.pop("email"), registration.pop("password_hash"), registration)
+    industries = find_industries_by_ocmms_id(f"SUMMARY{number}" for number in range(31))
+    return [industries[f"SUMMARY{number}"][0] for number in range(31)]
+
+
+def test_summary_follows_every_write(user_ids):
+    for user_id in user_ids[:3] + user_ids[-1:]:
+        save_stack(user_id, _stack("S1", "PM,SO2"))
+        with get_database_connection() as conn:
+            stack_id = conn.execute("SELECT stack_id FROM stacks WHERE user_id = ?", (user_id,)).fetchone()[0]
+        save_cems(user_id, stack_id, _cems("PM"))
+    bulk_save_stacks([_stack("S2", "PM,SO2,NOx") | {"user_id": user_id} for user_id in user_ids[3:6]])
+    with get_database_connection() as conn:
+        stack_id = conn.execute("SELECT stack_id FROM stacks WHERE user_id = ?", (user_ids[3],)).fetchone()[0]
+    bulk_save_cems([_cems(parameter) | {"stack_id": stack_id, "user_id": user_ids[3]} for parameter in ("PM", "NOx")])
+
+    with get_database_connection() as conn:
+        # Writes outside the app: moving, resizing and deleting industries and stacks
+        conn.execute("UPDATE industry SET district = 'Siwan' WHERE user_id = ?", (user_ids[0],))
+        conn.execute("UPDATE industry SET industry_category = 'Cement', num_stacks = 5 WHERE user_id = ?",
+                     (user_ids[3],))
+        for user_id in user_ids[1], user_ids[5]:
+            for table in "cems_instruments", "stack_parameters":
+                conn.execute(f"DELETE FROM {table} WHERE stack_id IN (SELECT stack_id FROM stacks WHERE user_id = ?)",
+                             (user_id,))
+            conn.execute("DELETE FROM stacks WHERE user_id = ?", (user_id,))
+        conn.execute("UPDATE industry SET completed_stacks = 0 WHERE user_id = ?", (user_ids[1],))
+        conn.execute("DELETE FROM industry WHERE user_id = ?", (user_ids[5],))
+        conn.execute("UPDATE stacks SET number_params = 4 WHERE user_id = ?", (user_ids[4],))
+
+        assert _summary(conn) == sorted(conn.execute(RECOMPUTED_SUMMARY).fetchall())
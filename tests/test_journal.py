@@ -0,0 +1,78 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+import journal
+from db import get_connection_pool
+from journal import DONE, FAILED, PENDING, SubmissionJournal
+from migrations import ensure_schema
+from repository import REGISTRATION_COLUMNS, STACK_FORM_COLUMNS, find_industries_by_ocmms_id, list_user_stacks
+
+
+def _registration(number):
+    industry = {column: None for column in REGISTRATION_COLUMNS}
+    industry.update(state_ocmms_id=f"JOURNAL{number}", industry_name=f"Journal Industry {number}", num_stacks=3)
+    return {"email": f"journal{number}@example.com", "password_hash": "x", "industry": industry}
+
+
+def _stacks(*identities):
+    stack = {column: None for column in STACK_FORM_COLUMNS} | {"parameters": "PM"}
+    return {"stacks": [stack | {"stack_identity": identity, "process_attached": identity} for identity in identities]}
+
+
+def _unreachable():
+    raise sqlite3.OperationalError("unable to open database file")
+
+
+@contextmanager
+def outage():
+    """Makes the primary unreachable inside the block: idle connections are set aside and new ones fail."""
+    with pytest.MonkeyPatch.context() as patch:
+        pool = get_connection_pool()
+        patch.setattr(pool, "_idle", queue.LifoQueue())
+        patch.setattr(pool, "_connect", _unreachable)
+        yield
+
+
+@pytest.fixture
+def submissions(monkeypatch):
+    ensure_schema()
+    monkeypatch.setattr(journal, "RETRY_BASE_DELAY", 0.05)
+    return SubmissionJournal(":memory:")
+
+
+def test_submissions_made_during_an_outage_are_replayed(submissions):
+    with outage():
+        registration = submissions.submit("registration", None, _registration(1))
+        assert submissions.wait(registration, timeout=0.3)["status"] == PENDING
+        assert submissions.get(registration)["attempts"] >= 1
+        assert submissions.get(registration)["last_error"] == "unable to open database file"
+
+    assert submissions.wait(registration, timeout=10)["status"] == DONE
+    assert "JOURNAL1" in find_industries_by_ocmms_id(["JOURNAL1"])
+
+
+def test_a_users_submissions_are_replayed_in_order(submissions):
+    assert submissions.wait(submissions.submit("registration", None, _registration(2)))["status"] == DONE
+    user_id = find_industries_by_ocmms_id(["JOURNAL2"])["JOURNAL2"][0]
+
+    with outage():
+        first = submissions.submit("stack_batch", user_id, _stacks("S1", "S2"))
+        second = submissions.submit("stack_batch", user_id, _stacks("S3"))
+        assert submissions.wait(second, timeout=0.3)["status"] == PENDING
+        assert [len(batch["stacks"]) for batch in submissions.pending(user_id, "stack_batch")] == [2, 1]
+
+    assert submissions.wait(first, timeout=10)["status"] == DONE
+    assert submissions.wait(second, timeout=10)["status"] == DONE
+    assert [process for _, process, _ in list_user_stacks(user_id)] == ["S1", "S2", "S3"]
+
+
+def test_a_rejected_submission_fails_for_good(submissions):
+    assert submissions.wait(submissions.submit("registration", None, _registration(3)))["status"] == DONE
+    duplicate = submissions.wait(submissions.submit("registration", None, _registration(3)))
+    assert duplicate["status"] == FAILED
+    assert duplicate["last_error"] == "Email already exists."
+    assert [submission["submission_id"] for submission in submissions.list_failed()] == [duplicate["submission_id"]]
+    assert submissions.list_by_ids([duplicate["submission_id"]]) == [duplicate]
@@ -0,0 +1,20 @@
+import pytest
+
+from db import LocalSQLiteBackend
+from migrations import run_migrations
+from query_plans import HOT_QUERIES, find_table_scans, query_plan
+
+
+@pytest.fixture(scope="module")
+def conn():
+    backend = LocalSQLiteBackend(":memory:")
+    conn = backend.connect()
+    run_migrations(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_indexes(conn, name):
+    sql, params = HOT_QUERIES[name]
+    assert name not in find_table_scans(conn, {name: (sql, params)}), query_plan(conn, sql, params)
@@ -0,0 +1,50 @@
+import pytest
+
+from db import get_database_connection
+from migrations import ensure_schema
+from repository import REGISTRATION_COLUMNS, bulk_register_industries, find_spellings, list_industries
+
+NAMES = ["Ganga Cement Works", "Gangs Cement Co", "Patna Sugar Mill", "Sone Paper Mill", "Onex Polymers",
+         "Ram Son Traders"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def registry():
+    ensure_schema()
+    registrations = []
+    for number, name in enumerate(NAMES):
+        registration = {column: None for column in REGISTRATION_COLUMNS}
+        registration.update(email=f"search{number}@example.com", password_hash="x", industry_name=name,
+                            state_ocmms_id=f"SEARCH{number}", district="Gaya", num_stacks=1)
+        registrations.append(registration)
+    bulk_register_industries(registrations)
+
+
+def _names(search, fuzzy=False):
+    industries, total = list_industries(search, fuzzy=fuzzy, limit=100)
+    assert total == len(industries)
+    return [industry["industry_name"] for industry in industries if industry["industry_name"] in NAMES]
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("Gabga", "Ganga Cement Works"),  # A character replaced
+    ("Gnaga", "Ganga Cement Works"),  # Two characters swapped
+    ("Gangaa", "Ganga Cement Works"),  # One added
+    ("Gnga", "Ganga Cement Works"),  # One missing
+    ("Pakna", "Patna Sugar Mill"),
+])
+def test_a_typo_still_finds_the_industry(search, expected):
+    assert _names(search) == []
+    assert expected in _names(search, fuzzy=True)
+
+
+def test_short_spellings_are_not_tried():
+    with get_database_connection() as conn:
+        spellings = find_spellings(conn, "Sone")["Sone"]
+    assert "sone" in spellings
+    assert all(len(spelling) >= 4 for spelling in spellings)
+    assert _names("Sone", fuzzy=True) == ["Sone Paper Mill"]
+
+
+def test_fewer_typos_rank_first():
+    assert _names("Ganga Cemnet", fuzzy=True) == ["Ganga Cement Works", "Gangs Cement Co"]
@@ -0,0 +1,59 @@
+import hashlib
+import re
+
+
+# Utility Functions
+def hash_password(password):
+    """Hashes the password using SHA-256."""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+EMAIL_REGEX = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
+
+# Regex pattern for valid mobile numbers (starting with 6-9 and followed by 9 digits)
+PHONE_REGEX = r"^[6-9][0-9]{9}$"
+
+
+def is_valid_email(email):
+    """Validates email format."""
+    return re.match(EMAIL_REGEX, email)
+
+
+def isValid(phone):
+    if phone is None or phone == 0:
+        return False  # Return False if phone is None or zero
+
+    # Convert to string and strip any unwanted spaces
+    phone_str = str(phone).strip()
+
+    # Use fullmatch to ensure the entire phone number matches the pattern
+    return bool(re.fullmatch(PHONE_REGEX, phone_str))
+
+
+category = ["Aluminium", "Cement", "Chlor Alkali", "Copper", "Distillery", "Dye & Dye Intermediates", "Fertilizer",
+            "Iron & Steel", "Oil Refinery", "Pesticides", "Petrochemical", "Pharmaceuticals", "Power Plant",
+            "Pulp And Paper", "Sugar", "Tannery", "Zinc", "CETP", "STP", "Slaughter House", "Textile",
+            "Food, Dairy & Beverages", "Common Hazardous Waste Treatment Facility",
+            "Common Biomedical Waste Incinerators"]
+
+state_list = ["Bihar"]
+
+dist = ["Araria", "Arwal", "Aurangabad", "Banka", "Begusarai", "Bhagalpur", "Bhojpur", "Buxar",
+        "Darbhanga", "Gaya", "Gopalganj", "Jamui", "Jehanabad", "Kaimur (Bhabua)", "Katihar", "Khagaria",
+        "Kishanganj", "Lakhisarai", "Madhepura", "Madhubani", "Munger", "Muzaffarpur", "Nalanda",
+        "Nawada", "Pashchim Champaran", "Patna", "Purbi Champaran", "Purnia", "Rohtas", "Saharsa",
+        "Samastipur", "Saran", "Sheikhpura", "Sheohar", "Sitamarhi", "Siwan", "Supaul", "Vaishali"]
+
+# Bounds of Bihar, which every stack location must fall within
+LATITUDE_RANGE = (24.33611111, 27.52083333)
+LONGITUDE_RANGE = (83.33055556, 88.29444444)
+
+# Pollutants a CEMS can monitor
+parameter_options = ["PM", "SO2", "NOx", "CO", "O2", "NH3", "HCL", "Total Fluoride", "HF", "Hg", "H2S", "CL2"]
+
+
+def split_parameters(parameters):
+    """Splits a comma-separated parameter list into stripped, de-duplicated names in order."""
+    if not parameters:
+        return []
+    return list(dict.fromkeys(parameter.strip() for parameter in parameters.split(",") if parameter.strip()))